@@ -3,7 +3,8 @@ from django.contrib import admin
 # Register your models here.
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import WasteClassification
+from .models import WasteClassification, BatchJob
+from .tasks import reanalyze_waste_task, submit_batch_task
 
 @admin.register(WasteClassification)
 class WasteClassificationAdmin(admin.ModelAdmin):
@@ -17,6 +18,7 @@ class WasteClassificationAdmin(admin.ModelAdmin):
     search_fields = [
         'predicted_category', 'waste_description', 'state'
     ]
+    actions = ['reanalyze_now', 'reanalyze_in_batch']
     readonly_fields = [
         'created_at', 'updated_at', 'image_preview', 'confidence_score',
         'predicted_category', 'gemini_raw_response'
@@ -71,5 +73,32 @@ class WasteClassificationAdmin(admin.ModelAdmin):
         return "No Image"
     image_preview.short_description = "Image Preview"
 
+    def reanalyze_now(self, request, queryset):
+        classification_ids = list(queryset.values_list('id', flat=True))
+        reanalyze_waste_task.delay(classification_ids)
+        self.message_user(request, f"Queued {len(classification_ids)} classifications for re-analysis")
+    reanalyze_now.short_description = "Re-analyze with Gemini now"
+
+    def reanalyze_in_batch(self, request, queryset):
+        # Uploading the batch can take minutes, so it is left to a worker
+        classification_ids = list(queryset.values_list('id', flat=True))
+        submit_batch_task.delay(classification_ids)
+        self.message_user(request, f"Queued {len(classification_ids)} classifications for Gemini batch mode")
+    reanalyze_in_batch.short_description = "Re-analyze with Gemini batch mode"
+
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related()
+        queryset = super().get_queryset(request)
+        # The changelist only needs the list_display columns; the change view
+        # goes through this queryset too, so it keeps loading full rows
+        if request.resolver_match and request.resolver_match.url_name == 'waste_classifier_wasteclassification_changelist':
+            queryset = queryset.only(
+                'id', 'predicted_category', 'state', 'confidence_score', 'image', 'created_at'
+            )
+        return queryset
+
+
+@admin.register(BatchJob)
+class BatchJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'state', 'created_at', 'updated_at']
+    list_filter = ['state']
+    readonly_fields = ['name', 'state', 'classification_ids', 'created_at', 'updated_at']
@@ -0,0 +1,42 @@
+from types import MappingProxyType
+from typing import Tuple
+
+WASTE_CATEGORIES: Tuple[Tuple[str, str], ...] = (
+    ('MEDICAL', 'Medical Waste'),
+    ('E_WASTE', 'E-Waste'),
+    ('GENERAL', 'General Waste'),
+    ('RECYCLABLE', 'Recyclable Waste'),
+    ('NON_RECYCLABLE', 'Non-Recyclable Waste'),
+    ('HAZARDOUS', 'Hazardous Waste'),
+    ('ORGANIC', 'Organic Waste'),
+)
+
+WASTE_CATEGORY_CODES = frozenset(code for code, _ in WASTE_CATEGORIES)
+
+WASTE_CATEGORIES_DICT = MappingProxyType(dict(WASTE_CATEGORIES))
+
+INDIAN_STATES: Tuple[Tuple[str, str], ...] = (
+    ('AP', 'Andhra Pradesh'), ('AR', 'Arunachal Pradesh'), ('AS', 'Assam'),
+    ('BR', 'Bihar'), ('CT', 'Chhattisgarh'), ('GA', 'Goa'), ('GJ', 'Gujarat'),
+    ('HR', 'Haryana'), ('HP', 'Himachal Pradesh'), ('JH', 'Jharkhand'),
+    ('KA', 'Karnataka'), ('KL', 'Kerala'), ('MP', 'Madhya Pradesh'),
+    ('MH', 'Maharashtra'), ('MN', 'Manipur'), ('ML', 'Meghalaya'),
+    ('MZ', 'Mizoram'), ('NL', 'Nagaland'), ('OR', 'Odisha'), ('PB', 'Punjab'),
+    ('RJ', 'Rajasthan'), ('SK', 'Sikkim'), ('TN', 'Tamil Nadu'),
+    ('TG', 'Telangana'), ('TR', 'Tripura'), ('UP', 'Uttar Pradesh'),
+    ('UT', 'Uttarakhand'), ('WB', 'West Bengal'), ('AN', 'Andaman and Nicobar'),
+    ('CH', 'Chandigarh'), ('DH', 'Dadra and Nagar Haveli'), ('DD', 'Daman and Diu'),
+    ('DL', 'Delhi'), ('JK', 'Jammu and Kashmir'), ('LA', 'Ladakh'),
+    ('LD', 'Lakshadweep'), ('PY', 'Puducherry'),
+)
+
+INDIAN_STATES_DICT = MappingProxyType(dict(INDIAN_STATES))
+
+MAX_IMAGE_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Leading bytes of the image formats accepted for upload
+IMAGE_SIGNATURES: Tuple[bytes, ...] = (
+    b'\xff\xd8\xff',       # JPEG
+    b'\x89PNG\r\n\x1a\n',  # PNG
+    b'BM',                 # BMP
+)
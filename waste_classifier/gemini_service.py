@@ -1,150 +1,170 @@
 import google.generativeai as genai
+from google import genai as google_genai
+import imagehash
+import base64
+import fastjsonschema
 import json
 import logging
+import orjson
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
 from PIL import Image
 from django.conf import settings
-from typing import Dict, Any, Optional
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from typing import Dict, Any, List, Optional, Tuple
 import os
 
-logger = logging.getLogger(__name__)
+from .constants import INDIAN_STATES_DICT, WASTE_CATEGORY_CODES
+from .models import BatchJob
 
-class GeminiWasteAnalyzer:
-    def __init__(self):
-        """Initialize Gemini API client"""
-        if not settings.GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY not found in settings")
+logger = logging.getLogger(__name__)
 
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-
-        # State code to name mapping
-        self.INDIAN_STATES = {
-            'AP': 'Andhra Pradesh', 'AR': 'Arunachal Pradesh', 'AS': 'Assam',
-            'BR': 'Bihar', 'CT': 'Chhattisgarh', 'GA': 'Goa', 'GJ': 'Gujarat',
-            'HR': 'Haryana', 'HP': 'Himachal Pradesh', 'JH': 'Jharkhand',
-            'KA': 'Karnataka', 'KL': 'Kerala', 'MP': 'Madhya Pradesh',
-            'MH': 'Maharashtra', 'MN': 'Manipur', 'ML': 'Meghalaya',
-            'MZ': 'Mizoram', 'NL': 'Nagaland', 'OR': 'Odisha', 'PB': 'Punjab',
-            'RJ': 'Rajasthan', 'SK': 'Sikkim', 'TN': 'Tamil Nadu',
-            'TG': 'Telangana', 'TR': 'Tripura', 'UP': 'Uttar Pradesh',
-            'UT': 'Uttarakhand', 'WB': 'West Bengal', 'AN': 'Andaman and Nicobar',
-            'CH': 'Chandigarh', 'DH': 'Dadra and Nagar Haveli', 'DD': 'Daman and Diu',
-            'DL': 'Delhi', 'JK': 'Jammu and Kashmir', 'LA': 'Ladakh',
-            'LD': 'Lakshadweep', 'PY': 'Puducherry',
+# Analysis results are cached by image perceptual hash for 30 days
+ANALYSIS_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+# Maximum pHash Hamming distance for a near-duplicate image to reuse a result
+PHASH_MAX_DISTANCE = 4
+# The near-duplicate index splits each 64-bit pHash into PHASH_MAX_DISTANCE + 1 bands;
+# two hashes within PHASH_MAX_DISTANCE bits must match exactly on at least one band
+PHASH_BITS = 64
+PHASH_BANDS = PHASH_MAX_DISTANCE + 1
+# Images are downsampled to this long edge (px) before being sent to Gemini
+GEMINI_MAX_IMAGE_EDGE = 1568
+# Concurrent Gemini calls allowed in analyze_many, to respect rate limits
+GEMINI_MAX_CONCURRENT_REQUESTS = 20
+
+# Expected structure of a Gemini analysis reply, compiled once at import
+_validate_response_schema = fastjsonschema.compile({
+    'type': 'object',
+    'required': [
+        'waste_classification',
+        'disposal_instructions',
+        'risk_assessment',
+        'safety_measures',
+        'additional_info'
+    ],
+    'properties': {
+        'waste_classification': {
+            'type': 'object',
+            'required': ['category', 'confidence', 'description'],
+            'properties': {
+                'category': {'enum': sorted(WASTE_CATEGORY_CODES)},
+                'confidence': {'type': 'number', 'minimum': 0, 'maximum': 1}
+            }
         }
-
-    def get_state_name_from_code(self, state_code: str) -> str:
-        """Convert state code to full name"""
-        return self.INDIAN_STATES.get(state_code, state_code)
-
-    def _parse_gemini_json_response(self, raw_response: str) -> Dict[str, Any]:
-        """
-        Parse Gemini response that may be wrapped in markdown code blocks
-        """
-        logger.info(f"Parsing Gemini response of length: {len(raw_response)}")
-
-        # Clean up the response
-        cleaned = raw_response.strip()
-
-        # Remove markdown code blocks
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]  # Remove '```json'
-        elif cleaned.startswith('```'):
-            cleaned = cleaned[3:]  # Remove '```'
-
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]  # Remove '```'
-
-        # Clean up any remaining whitespace
-        cleaned = cleaned.strip()
-
-        logger.info(f"Cleaned response first 100 chars: {repr(cleaned[:100])}")
-
-        try:
-            parsed_data = json.loads(cleaned)
-            logger.info("Successfully parsed JSON from Gemini response")
-            return parsed_data
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing failed: {e}")
-            logger.error(f"Error at position {e.pos}")
-            if e.pos < len(cleaned):
-                logger.error(f"Text around error: {repr(cleaned[max(0, e.pos-20):e.pos+20])}")
-            logger.error(f"Full cleaned response: {repr(cleaned)}")
-            raise
-
-    def analyze_waste_image(self, image_path: str, state_code: str, state_name: str) -> Dict[str, Any]:
-        """
-        Analyze waste image using Gemini Vision API
-
-        Args:
-            image_path: Path to the uploaded image
-            state_code: Indian state code (e.g., 'MH', 'KA')
-            state_name: Full state name
-
-        Returns:
-            Dictionary with analysis results
-        """
-        try:
-            # Load and validate image
-            if not os.path.exists(image_path):
-                return {
-                    'success': False,
-                    'error': f'Image file not found: {image_path}'
-                }
-
-            # Open image with PIL
-            image = Image.open(image_path)
-
-            # Create comprehensive prompt for waste analysis
-            prompt = self._create_analysis_prompt(state_name, state_code)
-
-            # Generate content using Gemini
-            response = self.model.generate_content([prompt, image])
-
-            if not response or not response.text:
-                return {
-                    'success': False,
-                    'error': 'No response received from Gemini API'
-                }
-
-            logger.info(f"Raw Gemini response: {repr(response.text[:200])}")
-
-            # Parse JSON response with improved handling
+    }
+})
+
+
+def parse_gemini_response(raw_response):
+    """
+    Parse Gemini API response that may be wrapped in markdown code blocks
+    """
+    logger.info("Raw response length: %d", len(raw_response))
+    logger.info("Raw response first 200 chars: %r", raw_response[:200])
+
+    # Clean up the response
+    cleaned_response = raw_response.strip()
+
+    # Gemini usually wraps the JSON in a ```json fence, so drop the opening
+    # fence line and the closing fence before the first parse attempt
+    json_text = cleaned_response
+    if json_text.startswith('```'):
+        newline_idx = json_text.find('\n')
+        end_idx = json_text.rfind('```')
+        if 0 < newline_idx < end_idx:
+            json_text = json_text[newline_idx + 1:end_idx]
+
+    try:
+        # First, try to parse as raw JSON
+        return orjson.loads(json_text)
+    except orjson.JSONDecodeError as e:
+        logger.info("Direct JSON parsing failed: %s", e)
+
+        # More aggressive markdown removal
+        if '```json' in cleaned_response:
+            # Find the start of the JSON
+            start_idx = cleaned_response.find('```json') + 7
+            # Find the end of the JSON (look for closing ```)
+            end_idx = cleaned_response.rfind('```')
+
+            if start_idx < end_idx:
+                json_string = cleaned_response[start_idx:end_idx].strip()
+                logger.info("Extracted JSON string length: %d", len(json_string))
+                logger.info("Extracted JSON first 100 chars: %r", json_string[:100])
+
+                try:
+                    return orjson.loads(json_string)
+                except orjson.JSONDecodeError as e2:
+                    logger.error("Failed to parse extracted JSON: %s", e2)
+                    # Log the problematic part
+                    logger.error("JSON string around error: %r", json_string[max(0, e2.pos-50):e2.pos+50])
+
+        # Fall back to the outermost braces; a plain scan stays linear on
+        # malformed replies where a greedy regex could backtrack
+        start_idx = cleaned_response.find('{')
+        end_idx = cleaned_response.rfind('}')
+        if 0 <= start_idx < end_idx:
+            json_candidate = cleaned_response[start_idx:end_idx + 1]
+            logger.info("Found JSON candidate: %r", json_candidate[:100])
             try:
-                parsed_data = self._parse_gemini_json_response(response.text)
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parsing error: {e}")
-                logger.error(f"Full raw response: {response.text}")
-                return {
-                    'success': False,
-                    'error': 'Failed to parse API response as JSON',
-                    'raw_response': response.text
-                }
+                return orjson.loads(json_candidate)
+            except orjson.JSONDecodeError as e3:
+                logger.error("JSON candidate parsing failed: %s", e3)
+
+        # If all else fails, save the raw response for debugging
+        logger.debug("Complete raw response: %r", raw_response)
+        raise ValueError("No valid JSON found in response. All parsing methods failed.")
+
+
+def _phash_band_keys(phash: imagehash.ImageHash, state_code: str) -> List[str]:
+    """Redis keys of the near-duplicate index sets a pHash belongs to, one per band"""
+    value = int(str(phash), 16)
+    keys = []
+    start = 0
+    for band in range(PHASH_BANDS):
+        width = (PHASH_BITS - start) // (PHASH_BANDS - band)
+        band_value = (value >> start) & ((1 << width) - 1)
+        keys.append(f"waste:phashes:{state_code}:{band}:{band_value:x}")
+        start += width
+    return keys
+
+
+def shrink_stored_image(image_path: str) -> bool:
+    """
+    Downscale a stored upload in place to Gemini's long-edge cap
+
+    Later reads (analysis, re-analysis, report thumbnails) then work on the
+    smaller file, and JPEGs within the cap are sent to Gemini without a re-encode.
+
+    Returns:
+        True if the file was rewritten
+    """
+    # Write then rename so a concurrent reader never sees a partial file
+    tmp_path = f"{image_path}.{os.getpid()}.tmp"
+    try:
+        with Image.open(image_path) as image:
+            if max(image.size) <= GEMINI_MAX_IMAGE_EDGE:
+                return False
 
-            # Validate required fields
-            if not self._validate_response_structure(parsed_data):
-                return {
-                    'success': False,
-                    'error': 'Invalid response structure from Gemini API',
-                    'raw_response': response.text
-                }
+            exif = image.getexif()
+            image.draft(image.mode, (GEMINI_MAX_IMAGE_EDGE, GEMINI_MAX_IMAGE_EDGE))
+            image.thumbnail((GEMINI_MAX_IMAGE_EDGE, GEMINI_MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+            image.save(tmp_path, format=image.format, quality=85, optimize=True, exif=exif)
+        os.replace(tmp_path, image_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return True
 
-            return {
-                'success': True,
-                'data': parsed_data,
-                'raw_response': response.text
-            }
 
-        except Exception as e:
-            logger.error(f"Gemini API error: {str(e)}")
-            return {
-                'success': False,
-                'error': f'Gemini API error: {str(e)}'
-            }
-
-    def _create_analysis_prompt(self, state_name: str, state_code: str) -> str:
-        """Create comprehensive prompt for waste analysis"""
-        return f"""
+def _format_prompt(state_name: str, state_code: str) -> str:
+    """Build the waste analysis prompt for a state"""
+    return f"""
 You are an expert waste management consultant specializing in Indian waste disposal regulations and environmental safety. Analyze the uploaded image and provide comprehensive waste classification and disposal guidance.
 
 CRITICAL: Respond with ONLY valid JSON. Do not wrap your response in markdown code blocks or add any additional text. Your entire response must be parseable as JSON.
@@ -188,41 +208,367 @@ Analysis Guidelines:
 REMEMBER: Return ONLY the JSON object. No markdown, no additional text, no code blocks.
 """
 
-    def _validate_response_structure(self, data: Dict[str, Any]) -> bool:
-        """Validate that the response has the expected structure"""
-        required_keys = [
-            'waste_classification',
-            'disposal_instructions',
-            'risk_assessment',
-            'safety_measures',
-            'additional_info'
-        ]
-
-        # Check main keys exist
-        for key in required_keys:
-            if key not in data:
-                logger.error(f"Missing required key: {key}")
-                return False
 
-        # Check waste_classification has required fields
-        waste_class = data.get('waste_classification', {})
-        if not all(k in waste_class for k in ['category', 'confidence', 'description']):
-            logger.error("Invalid waste_classification structure")
-            return False
+# Prompts for every state, rendered once at import
+_PROMPT_BY_CODE = {
+    state_code: _format_prompt(state_name, state_code)
+    for state_code, state_name in INDIAN_STATES_DICT.items()
+}
 
-        # Validate category
-        valid_categories = ['MEDICAL', 'E_WASTE', 'GENERAL', 'RECYCLABLE', 'NON_RECYCLABLE', 'HAZARDOUS', 'ORGANIC']
-        if waste_class.get('category') not in valid_categories:
-            logger.error(f"Invalid category: {waste_class.get('category')}")
-            return False
 
-        # Validate confidence score
-        confidence = waste_class.get('confidence')
-        if not isinstance(confidence, (int, float)) or not (0.0 <= confidence <= 1.0):
-            logger.error(f"Invalid confidence score: {confidence}")
-            return False
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_model():
+    """Return the shared Gemini model, configuring the API client once per process"""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _MODEL = genai.GenerativeModel('gemini-2.5-flash')
+    return _MODEL
+
+
+@lru_cache(maxsize=1)
+def _get_batch_client():
+    """Return the shared Batch Mode client so its HTTP connections are reused"""
+    return google_genai.Client(api_key=settings.GEMINI_API_KEY)
+
+
+@lru_cache(maxsize=1)
+def get_analyzer():
+    """
+    Return the process-wide GeminiWasteAnalyzer
+
+    The analyzer keeps no per-call state, so one instance is shared by every
+    task and thread in the process.
+    """
+    return GeminiWasteAnalyzer()
+
+
+class GeminiWasteAnalyzer:
+    def __init__(self):
+        """Initialize Gemini API client"""
+        if not settings.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not found in settings")
+
+        self.model = _get_model()
+
+    def get_state_name_from_code(self, state_code: str) -> str:
+        """Convert state code to full name"""
+        return INDIAN_STATES_DICT.get(state_code, state_code)
+
+    def analyze_waste_image(self, image_path: str, state_code: str, state_name: str) -> Dict[str, Any]:
+        """
+        Analyze waste image using Gemini Vision API
+
+        Args:
+            image_path: Path to the uploaded image
+            state_code: Indian state code (e.g., 'MH', 'KA')
+            state_name: Full state name
+
+        Returns:
+            Dictionary with analysis results
+        """
+        try:
+            prepared = self._prepare_analysis(image_path, state_code, state_name)
+            if 'result' in prepared:
+                return prepared['result']
+
+            # Generate content using Gemini
+            response = self.model.generate_content(prepared['contents'])
+
+            return self._process_response(response, prepared['phash'], state_code)
+
+        except Exception as e:
+            logger.error(f"Gemini API error: {str(e)}")
+            return {
+                'success': False,
+                'error': f'Gemini API error: {str(e)}'
+            }
+
+    def analyze_many(self, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several images concurrently on a bounded thread pool
+
+        The sync client is thread-safe, whereas the grpc.aio channel behind
+        generate_content_async stays bound to the first event loop it ran on.
+
+        Args:
+            items: analyze_waste_image keyword arguments, one dictionary per image
+
+        Returns:
+            Analysis results in the same order as items
+        """
+        if not items:
+            return []
 
-        return True
+        with ThreadPoolExecutor(max_workers=min(GEMINI_MAX_CONCURRENT_REQUESTS, len(items))) as executor:
+            return list(executor.map(lambda item: self.analyze_waste_image(**item), items))
+
+    def _prepare_analysis(self, image_path: str, state_code: str, state_name: str) -> Dict[str, Any]:
+        """
+        Load the image and build the Gemini request contents
+
+        Returns:
+            Dictionary with either a finished 'result' (missing image or cache hit)
+            or the request 'contents' and the image 'phash'
+        """
+        # Load and validate image
+        if not os.path.exists(image_path):
+            return {
+                'result': {
+                    'success': False,
+                    'error': f'Image file not found: {image_path}'
+                }
+            }
+
+        # Open image with PIL, downsampled and re-encoded for upload
+        image, image_data = self._load_image(image_path)
+
+        # Reuse the analysis of an identical or near-identical image
+        phash = imagehash.phash(image)
+        cached_result = self._get_cached_analysis(phash, state_code)
+        if cached_result is not None:
+            logger.info(f"Using cached Gemini analysis for image hash {phash}")
+            return {'result': cached_result}
+
+        # Create comprehensive prompt for waste analysis
+        prompt = self._create_analysis_prompt(state_name, state_code)
+
+        return {
+            'contents': [prompt, {'mime_type': 'image/jpeg', 'data': image_data}],
+            'phash': phash
+        }
+
+    def _process_response(self, response, phash: imagehash.ImageHash, state_code: str) -> Dict[str, Any]:
+        """Parse, validate and cache a Gemini response"""
+        if not response or not response.text:
+            return {
+                'success': False,
+                'error': 'No response received from Gemini API'
+            }
+
+        # Parse JSON response with improved handling
+        try:
+            parsed_data = parse_gemini_response(response.text)
+        except ValueError as e:
+            logger.error("JSON parsing error: %s", e)
+            return {
+                'success': False,
+                'error': 'Failed to parse API response as JSON',
+                'raw_response': response.text
+            }
+
+        # Validate required fields
+        if not self._validate_response_structure(parsed_data):
+            return {
+                'success': False,
+                'error': 'Invalid response structure from Gemini API',
+                'raw_response': response.text
+            }
+
+        result = {
+            'success': True,
+            'data': parsed_data,
+            'raw_response': response.text
+        }
+        self._cache_analysis(phash, state_code, result)
+        return result
+
+    def _load_image(self, image_path: str) -> Tuple[Image.Image, bytes]:
+        """
+        Open an image and shrink it to Gemini's long-edge cap
+
+        Returns:
+            The downsampled RGB image and its JPEG encoding
+        """
+        image = Image.open(image_path)
+
+        # JPEGs already within the cap are sent as uploaded, without a re-encode
+        if image.format == 'JPEG' and image.mode == 'RGB' and max(image.size) <= GEMINI_MAX_IMAGE_EDGE:
+            with open(image_path, 'rb') as image_file:
+                return image, image_file.read()
+
+        # Let libjpeg decode large JPEGs at a reduced scale instead of full resolution
+        image.draft('RGB', (GEMINI_MAX_IMAGE_EDGE, GEMINI_MAX_IMAGE_EDGE))
+        image.thumbnail((GEMINI_MAX_IMAGE_EDGE, GEMINI_MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        buffer = BytesIO()
+        image.save(buffer, format='JPEG', quality=85)
+        return image, buffer.getvalue()
+
+    def _get_cached_analysis(self, phash: imagehash.ImageHash, state_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis for the image hash, falling back to near duplicates
+
+        Near-duplicate candidates are the hashes sharing at least one band with this
+        one (see _phash_band_keys), scored by when they were cached so expired entries
+        are skipped. A near-duplicate is only used when exactly one live cached
+        analysis is close enough; index members whose analysis has gone are dropped.
+        """
+        try:
+            cached_result = cache.get(f"waste:{state_code}:{phash}")
+            if cached_result is not None:
+                return cached_result
+
+            redis = get_redis_connection('default')
+            oldest = time.time() - ANALYSIS_CACHE_TIMEOUT
+            pipeline = redis.pipeline(transaction=False)
+            for key in _phash_band_keys(phash, state_code):
+                pipeline.zrangebyscore(key, oldest, '+inf')
+            candidates = {member.decode() for members in pipeline.execute() for member in members}
+
+            matches = {}
+            for candidate in candidates:
+                candidate_hash = imagehash.hex_to_hash(candidate)
+                if phash - candidate_hash > PHASH_MAX_DISTANCE:
+                    continue
+
+                result = None if candidate == str(phash) else cache.get(f"waste:{state_code}:{candidate}")
+                if result is None:
+                    pipeline = redis.pipeline(transaction=False)
+                    for key in _phash_band_keys(candidate_hash, state_code):
+                        pipeline.zrem(key, candidate)
+                    pipeline.execute()
+                else:
+                    matches[candidate] = result
+
+            if len(matches) != 1:
+                return None
+
+            return next(iter(matches.values()))
+
+        except Exception as e:
+            logger.warning(f"Analysis cache lookup failed: {e}")
+            return None
+
+    def _cache_analysis(self, phash: imagehash.ImageHash, state_code: str, result: Dict[str, Any]) -> None:
+        """Cache a successful analysis under the image hash and index it for near-duplicate lookups"""
+        try:
+            cache.set(f"waste:{state_code}:{phash}", result, timeout=ANALYSIS_CACHE_TIMEOUT)
+
+            # Index sets expire with the analyses they point to and are trimmed on every write
+            now = time.time()
+            pipeline = get_redis_connection('default').pipeline(transaction=False)
+            for key in _phash_band_keys(phash, state_code):
+                pipeline.zadd(key, {str(phash): now})
+                pipeline.zremrangebyscore(key, '-inf', now - ANALYSIS_CACHE_TIMEOUT)
+                pipeline.expire(key, ANALYSIS_CACHE_TIMEOUT)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Could not cache analysis: {e}")
+
+    def submit_batch(self, classifications) -> BatchJob:
+        """
+        Submit waste images to Gemini Batch Mode for offline analysis
+
+        Args:
+            classifications: WasteClassification instances or queryset to analyze
+
+        Returns:
+            BatchJob tracking the submitted Gemini batch
+        """
+        client = _get_batch_client()
+
+        classification_ids = []
+        # Remove the request file however far the submission gets
+        requests_file = tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False)
+        try:
+            with requests_file:
+                for classification in classifications:
+                    classification_ids.append(classification.pk)
+                    _, image_data = self._load_image(classification.image.path)
+
+                    prompt = self._create_analysis_prompt(
+                        INDIAN_STATES_DICT.get(classification.state, classification.state),
+                        classification.state
+                    )
+                    request = {
+                        'key': str(classification.pk),
+                        'request': {
+                            'contents': [{
+                                'parts': [
+                                    {'inline_data': {
+                                        'mime_type': 'image/jpeg',
+                                        'data': base64.b64encode(image_data).decode('ascii')
+                                    }},
+                                    {'text': prompt}
+                                ]
+                            }]
+                        }
+                    }
+                    requests_file.write(json.dumps(request) + '\n')
+
+            uploaded_file = client.files.upload(
+                file=requests_file.name,
+                config={'display_name': 'waste-classification-batch', 'mime_type': 'jsonl'}
+            )
+            batch_job = client.batches.create(
+                model='gemini-2.5-flash',
+                src=uploaded_file.name,
+                config={'display_name': 'waste-classification-batch'}
+            )
+        finally:
+            os.unlink(requests_file.name)
+
+        logger.info(f"Submitted Gemini batch {batch_job.name} with {len(classification_ids)} requests")
+
+        return BatchJob.objects.create(
+            name=batch_job.name,
+            state=batch_job.state.name,
+            classification_ids=classification_ids
+        )
+
+    def get_batch_results(self, batch_job: BatchJob) -> Dict[str, Any]:
+        """
+        Fetch the state of a Gemini batch and its responses once it succeeded
+
+        Args:
+            batch_job: BatchJob returned by submit_batch
+
+        Returns:
+            Dictionary with the job state and raw response text keyed by classification id
+        """
+        client = _get_batch_client()
+        job = client.batches.get(name=batch_job.name)
+
+        responses = {}
+        if job.state.name == 'JOB_STATE_SUCCEEDED':
+            content = client.files.download(file=job.dest.file_name)
+            for line in content.decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                try:
+                    responses[result['key']] = result['response']['candidates'][0]['content']['parts'][0]['text']
+                except (KeyError, IndexError, TypeError):
+                    logger.error(f"No usable response for batch key {result.get('key')}: {result.get('error')}")
+
+        return {
+            'state': job.state.name,
+            'responses': responses
+        }
+
+    def _create_analysis_prompt(self, state_name: str, state_code: str) -> str:
+        """Create comprehensive prompt for waste analysis"""
+        prompt = _PROMPT_BY_CODE.get(state_code)
+        if prompt is None:
+            prompt = _format_prompt(state_name, state_code)
+        return prompt
+
+    def _validate_response_structure(self, data: Dict[str, Any]) -> bool:
+        """Validate that the response has the expected structure"""
+        try:
+            _validate_response_schema(data)
+            return True
+        except fastjsonschema.JsonSchemaException as e:
+            logger.error(f"Invalid response structure: {e.message}")
+            return False
 
     def test_api_connection(self) -> Dict[str, Any]:
         """Test Gemini API connection"""
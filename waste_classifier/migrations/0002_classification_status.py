@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-15 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("waste_classifier", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="wasteclassification",
+            name="error_message",
+            field=models.TextField(blank=True),
+        ),
+        # Rows created before background analysis were analyzed inline
+        migrations.AddField(
+            model_name="wasteclassification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("COMPLETED", "Completed"),
+                    ("FAILED", "Failed"),
+                ],
+                default="COMPLETED",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="wasteclassification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("COMPLETED", "Completed"),
+                    ("FAILED", "Failed"),
+                ],
+                default="PENDING",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-15 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("waste_classifier", "0002_classification_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BatchJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("state", models.CharField(default="JOB_STATE_PENDING", max_length=50)),
+                ("classification_ids", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Batch Job",
+                "verbose_name_plural": "Batch Jobs",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-15 01:17
+
+from django.db import migrations
+import waste_classifier.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("waste_classifier", "0003_batchjob"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="wasteclassification",
+            name="gemini_raw_response",
+            field=waste_classifier.models.ORJSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.7 on 2026-10-15 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("waste_classifier", "0004_orjson_raw_response"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="wasteclassification",
+            name="predicted_category",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("MEDICAL", "Medical Waste"),
+                    ("E_WASTE", "E-Waste"),
+                    ("GENERAL", "General Waste"),
+                    ("RECYCLABLE", "Recyclable Waste"),
+                    ("NON_RECYCLABLE", "Non-Recyclable Waste"),
+                    ("HAZARDOUS", "Hazardous Waste"),
+                    ("ORGANIC", "Organic Waste"),
+                ],
+                db_index=True,
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="wasteclassification",
+            name="state",
+            field=models.CharField(
+                choices=[
+                    ("AP", "Andhra Pradesh"),
+                    ("AR", "Arunachal Pradesh"),
+                    ("AS", "Assam"),
+                    ("BR", "Bihar"),
+                    ("CT", "Chhattisgarh"),
+                    ("GA", "Goa"),
+                    ("GJ", "Gujarat"),
+                    ("HR", "Haryana"),
+                    ("HP", "Himachal Pradesh"),
+                    ("JH", "Jharkhand"),
+                    ("KA", "Karnataka"),
+                    ("KL", "Kerala"),
+                    ("MP", "Madhya Pradesh"),
+                    ("MH", "Maharashtra"),
+                    ("MN", "Manipur"),
+                    ("ML", "Meghalaya"),
+                    ("MZ", "Mizoram"),
+                    ("NL", "Nagaland"),
+                    ("OR", "Odisha"),
+                    ("PB", "Punjab"),
+                    ("RJ", "Rajasthan"),
+                    ("SK", "Sikkim"),
+                    ("TN", "Tamil Nadu"),
+                    ("TG", "Telangana"),
+                    ("TR", "Tripura"),
+                    ("UP", "Uttar Pradesh"),
+                    ("UT", "Uttarakhand"),
+                    ("WB", "West Bengal"),
+                    ("AN", "Andaman and Nicobar"),
+                    ("CH", "Chandigarh"),
+                    ("DH", "Dadra and Nagar Haveli"),
+                    ("DD", "Daman and Diu"),
+                    ("DL", "Delhi"),
+                    ("JK", "Jammu and Kashmir"),
+                    ("LA", "Ladakh"),
+                    ("LD", "Lakshadweep"),
+                    ("PY", "Puducherry"),
+                ],
+                db_index=True,
+                max_length=2,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wasteclassification",
+            index=models.Index(
+                fields=["-created_at"], name="waste_class_created_dc92c6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wasteclassification",
+            index=models.Index(
+                fields=["predicted_category", "-created_at"],
+                name="waste_class_predict_d671b0_idx",
+            ),
+        ),
+    ]
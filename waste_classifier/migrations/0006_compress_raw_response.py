@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-15 01:22
+
+import json
+
+import zstandard
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def compress_raw_responses(apps, schema_editor):
+    WasteClassification = apps.get_model("waste_classifier", "WasteClassification")
+    compressor = zstandard.ZstdCompressor(level=3)
+
+    batch = []
+    rows = (
+        WasteClassification.objects.filter(gemini_raw_response__isnull=False)
+        .only("id", "gemini_raw_response")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for row in rows:
+        raw = row.gemini_raw_response
+        if not isinstance(raw, str):
+            raw = json.dumps(raw)
+        row.gemini_raw_response_zst = compressor.compress(raw.encode())
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            WasteClassification.objects.bulk_update(batch, ["gemini_raw_response_zst"])
+            batch = []
+    if batch:
+        WasteClassification.objects.bulk_update(batch, ["gemini_raw_response_zst"])
+
+
+def decompress_raw_responses(apps, schema_editor):
+    WasteClassification = apps.get_model("waste_classifier", "WasteClassification")
+    decompressor = zstandard.ZstdDecompressor()
+
+    batch = []
+    rows = (
+        WasteClassification.objects.filter(gemini_raw_response_zst__isnull=False)
+        .only("id", "gemini_raw_response_zst")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for row in rows:
+        row.gemini_raw_response = decompressor.decompress(
+            bytes(row.gemini_raw_response_zst)
+        ).decode()
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            WasteClassification.objects.bulk_update(batch, ["gemini_raw_response"])
+            batch = []
+    if batch:
+        WasteClassification.objects.bulk_update(batch, ["gemini_raw_response"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("waste_classifier", "0005_classification_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="wasteclassification",
+            name="gemini_raw_response_zst",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(compress_raw_responses, decompress_raw_responses),
+        migrations.RemoveField(
+            model_name="wasteclassification",
+            name="gemini_raw_response",
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-15 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("waste_classifier", "0006_compress_raw_response"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="wasteclassification",
+            index=models.Index(
+                fields=["state", "-created_at"], name="waste_class_state_04fbb1_idx"
+            ),
+        ),
+    ]
@@ -4,41 +4,47 @@ from django.db import models
 from django.db import models
 from django.core.validators import FileExtensionValidator
 import json
+import orjson
+import zstandard
+
+from .constants import WASTE_CATEGORIES, WASTE_CATEGORIES_DICT, INDIAN_STATES, INDIAN_STATES_DICT
+
+
+class ORJSONField(models.JSONField):
+    """JSONField that serializes values with orjson on save (referenced by migrations)"""
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None or hasattr(value, 'as_sql'):
+            return super().get_db_prep_value(value, connection, prepared)
+        return orjson.dumps(value).decode()
+
+
+class WasteClassificationManager(models.Manager):
+    """Leaves the compressed raw Gemini reply out of every query unless asked for"""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('gemini_raw_response_zst')
+
 
 class WasteClassification(models.Model):
-    WASTE_CATEGORIES = [
-        ('MEDICAL', 'Medical Waste'),
-        ('E_WASTE', 'E-Waste'),
-        ('GENERAL', 'General Waste'),
-        ('RECYCLABLE', 'Recyclable Waste'),
-        ('NON_RECYCLABLE', 'Non-Recyclable Waste'),
-        ('HAZARDOUS', 'Hazardous Waste'),
-        ('ORGANIC', 'Organic Waste'),
-    ]
+    WASTE_CATEGORIES = WASTE_CATEGORIES
 
-    INDIAN_STATES = [
-        ('AP', 'Andhra Pradesh'), ('AR', 'Arunachal Pradesh'), ('AS', 'Assam'),
-        ('BR', 'Bihar'), ('CT', 'Chhattisgarh'), ('GA', 'Goa'), ('GJ', 'Gujarat'),
-        ('HR', 'Haryana'), ('HP', 'Himachal Pradesh'), ('JH', 'Jharkhand'),
-        ('KA', 'Karnataka'), ('KL', 'Kerala'), ('MP', 'Madhya Pradesh'),
-        ('MH', 'Maharashtra'), ('MN', 'Manipur'), ('ML', 'Meghalaya'),
-        ('MZ', 'Mizoram'), ('NL', 'Nagaland'), ('OR', 'Odisha'), ('PB', 'Punjab'),
-        ('RJ', 'Rajasthan'), ('SK', 'Sikkim'), ('TN', 'Tamil Nadu'),
-        ('TG', 'Telangana'), ('TR', 'Tripura'), ('UP', 'Uttar Pradesh'),
-        ('UT', 'Uttarakhand'), ('WB', 'West Bengal'), ('AN', 'Andaman and Nicobar'),
-        ('CH', 'Chandigarh'), ('DH', 'Dadra and Nagar Haveli'), ('DD', 'Daman and Diu'),
-        ('DL', 'Delhi'), ('JK', 'Jammu and Kashmir'), ('LA', 'Ladakh'),
-        ('LD', 'Lakshadweep'), ('PY', 'Puducherry'),
+    ANALYSIS_STATUSES = [
+        ('PENDING', 'Pending'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
     ]
 
+    INDIAN_STATES = INDIAN_STATES
+
     image = models.ImageField(
         upload_to='waste_images/',
         validators=[FileExtensionValidator(['jpg', 'jpeg', 'png', 'bmp', 'webp'])]
     )
-    state = models.CharField(max_length=2, choices=INDIAN_STATES)
+    state = models.CharField(max_length=2, choices=INDIAN_STATES, db_index=True)
 
     # Gemini API Response Fields
-    predicted_category = models.CharField(max_length=20, choices=WASTE_CATEGORIES, blank=True)
+    predicted_category = models.CharField(max_length=20, choices=WASTE_CATEGORIES, blank=True, db_index=True)
     confidence_score = models.FloatField(blank=True, null=True)
     waste_description = models.TextField(blank=True)
 
@@ -60,16 +66,72 @@ class WasteClassification(models.Model):
     recyclability_info = models.TextField(blank=True)
     cost_implications = models.TextField(blank=True)
 
-    # Gemini raw response (for debugging)
-    gemini_raw_response = models.JSONField(blank=True, null=True)
+    # Gemini raw response (for debugging), zstd-compressed; use gemini_raw_response
+    gemini_raw_response_zst = models.BinaryField(blank=True, null=True)
+
+    # Background analysis state
+    status = models.CharField(max_length=10, choices=ANALYSIS_STATUSES, default='PENDING')
+    error_message = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = WasteClassificationManager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['predicted_category', '-created_at']),
+            models.Index(fields=['state', '-created_at']),
+        ]
         verbose_name = 'Waste Classification'
         verbose_name_plural = 'Waste Classifications'
 
+    @property
+    def gemini_raw_response(self):
+        """Raw Gemini reply text"""
+        if self.gemini_raw_response_zst is None:
+            return None
+        return zstandard.ZstdDecompressor().decompress(bytes(self.gemini_raw_response_zst)).decode()
+
+    @gemini_raw_response.setter
+    def gemini_raw_response(self, raw_response):
+        if raw_response is None:
+            self.gemini_raw_response_zst = None
+        else:
+            self.gemini_raw_response_zst = zstandard.ZstdCompressor(level=3).compress(raw_response.encode())
+
+    # Defining these stops Django generating its own get_FOO_display, which
+    # rebuilds a dict from the field choices on every call
+    def get_state_display(self):
+        return INDIAN_STATES_DICT.get(self.state, self.state)
+
+    def get_predicted_category_display(self):
+        return WASTE_CATEGORIES_DICT.get(self.predicted_category, self.predicted_category)
+
     def __str__(self):
         return f"{self.get_predicted_category_display()} - {self.get_state_display()} - {self.created_at.strftime('%Y-%m-%d')}"
+
+
+class BatchJob(models.Model):
+    """Gemini Batch Mode job submitted for bulk re-analysis"""
+    FINISHED_STATES = [
+        'JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED',
+        'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED',
+    ]
+
+    name = models.CharField(max_length=255, unique=True)
+    state = models.CharField(max_length=50, default='JOB_STATE_PENDING')
+    classification_ids = models.JSONField(default=list)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Batch Job'
+        verbose_name_plural = 'Batch Jobs'
+
+    def __str__(self):
+        return f"{self.name} - {self.state}"
@@ -5,118 +5,272 @@ from io import BytesIO
 from django.http import HttpResponse, FileResponse
 from django.template.loader import get_template
 from django.conf import settings
+from reportlab import rl_config
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak, KeepTogether
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.graphics.shapes import Drawing, Rect
-from reportlab.graphics import renderPDF
 from PIL import Image as PILImage
+import copy
 import datetime
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Produce deterministic PDFs (fixed document ids and timestamps)
+rl_config.invariant = 1
+
+# Report palette, parsed once at import rather than on every report
+C_TITLE = colors.HexColor('#2c3e50')
+C_SECTION = colors.HexColor('#34495e')
+C_BORDER = colors.HexColor('#bdc3c7')
+C_HEADER_BG = colors.HexColor('#ecf0f1')
+C_HIGHLIGHT = colors.HexColor('#e74c3c')
+C_INFO = colors.HexColor('#2980b9')
+C_BLUE = colors.HexColor('#3498db')
+C_INFO_BG = colors.HexColor('#ebf3fd')
+C_GREEN = colors.HexColor('#2ecc71')
+C_GREEN_BG = colors.HexColor('#d5f4e6')
+C_GREEN_DARK = colors.HexColor('#27ae60')
+
+# Table styles that never change between reports
+REPORT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), C_BLUE),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+    ('BACKGROUND', (1, 0), (1, -1), C_HEADER_BG),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, C_BORDER),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+])
+
+IMAGE_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), C_GREEN),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+    ('BACKGROUND', (1, 0), (1, -1), C_GREEN_BG),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('GRID', (0, 0), (-1, -1), 1, C_GREEN_DARK),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+# Page margin on every side, in points
+PAGE_MARGIN = 72
+
+# Per-thread render state (output buffer and page template) reused across
+# reports; frames hold layout position while a document builds, so they
+# can't be shared between threads
+_render_local = threading.local()
+
+
+def _get_page_template():
+    """Return this thread's single-frame A4 page template"""
+    page_template = getattr(_render_local, 'page_template', None)
+    if page_template is None:
+        frame = Frame(
+            PAGE_MARGIN, PAGE_MARGIN,
+            A4[0] - 2 * PAGE_MARGIN, A4[1] - 2 * PAGE_MARGIN,
+            id='normal'
+        )
+        page_template = _render_local.page_template = PageTemplate(id='main', frames=[frame], pagesize=A4)
+    return page_template
+
+# Timestamp format used in the report header
+TS_FMT = '%B %d, %Y at %I:%M %p'
+
+# Model fields read while rendering a report (everything but the raw Gemini reply)
+REPORT_FIELDS = (
+    'id', 'created_at', 'updated_at', 'image', 'state', 'predicted_category',
+    'confidence_score', 'waste_description', 'disposal_instructions',
+    'state_specific_laws', 'authorized_facilities', 'health_hazards',
+    'environmental_risks', 'precautions', 'protective_equipment',
+    'emergency_procedures', 'recyclability_info', 'cost_implications',
+)
+
+# Fields report_storage_name() needs to locate a built report
+REPORT_LOOKUP_FIELDS = ('id', 'created_at', 'updated_at')
+
+# Pixel size of the image thumbnail embedded in reports (drawn at 4" x 3")
+THUMBNAIL_SIZE = (400, 300)
+
+
+def _write_thumbnail(source, destination):
+    """Shrink the image in source to THUMBNAIL_SIZE and save it to destination as JPEG"""
+    with PILImage.open(source) as pil_img:
+        pil_img.draft('RGB', THUMBNAIL_SIZE)
+        pil_img.thumbnail(THUMBNAIL_SIZE, PILImage.LANCZOS)
+        thumbnail = pil_img if pil_img.mode == 'RGB' else pil_img.convert('RGB')
+        thumbnail.save(destination, 'JPEG', quality=85, optimize=True)
+
+
+def get_or_create_thumbnail(classification):
+    """
+    Return the report thumbnail for a classification image
+
+    The thumbnail is written next to the upload on first use and reused by
+    every later report, so the full-size image is only decoded once. Storages
+    without local paths (e.g. S3) get an in-memory BytesIO thumbnail instead.
+    """
+    try:
+        image_path = classification.image.path
+    except NotImplementedError:
+        buffer = BytesIO()
+        with classification.image.open('rb') as image_file:
+            _write_thumbnail(image_file, buffer)
+        buffer.seek(0)
+        return buffer
+
+    thumbnail_path = f"{image_path}.thumb.jpg"
+    if not os.path.exists(thumbnail_path):
+        # Write then rename so concurrent reports never read a partial file
+        tmp_path = f"{thumbnail_path}.{os.getpid()}.tmp"
+        try:
+            _write_thumbnail(image_path, tmp_path)
+            os.replace(tmp_path, thumbnail_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    return thumbnail_path
+
+
 class WasteClassificationPDFGenerator:
     """Generate PDF reports for waste classification results"""
 
+    # Stylesheet shared by every report, built on first use
+    _STYLES = None
+
+    # Static footer flowables, parsed once and copied into each report
+    _FOOTER = None
+
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
+        if type(self)._STYLES is None:
+            type(self)._STYLES = self._build_styles()
+        if type(self)._FOOTER is None:
+            type(self)._FOOTER = self._build_footer(type(self)._STYLES)
+        self.styles = type(self)._STYLES
+
+    @staticmethod
+    def _build_styles():
+        """Create the sample stylesheet with custom paragraph styles for the PDF"""
+        styles = getSampleStyleSheet()
 
-    def setup_custom_styles(self):
-        """Create custom paragraph styles for the PDF"""
         # Title style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomTitle',
-            parent=self.styles['Title'],
+            parent=styles['Title'],
             fontSize=24,
             spaceAfter=30,
-            textColor=colors.HexColor('#2c3e50'),
+            textColor=C_TITLE,
             alignment=TA_CENTER,
             fontName='Helvetica-Bold'
         ))
 
         # Section header style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='SectionHeader',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=16,
             spaceAfter=12,
             spaceBefore=20,
-            textColor=colors.HexColor('#34495e'),
+            textColor=C_SECTION,
             fontName='Helvetica-Bold',
             borderWidth=1,
-            borderColor=colors.HexColor('#bdc3c7'),
+            borderColor=C_BORDER,
             borderPadding=8,
-            backColor=colors.HexColor('#ecf0f1')
+            backColor=C_HEADER_BG
         ))
 
         # Content style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='ContentText',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             spaceAfter=12,
-            textColor=colors.HexColor('#2c3e50'),
+            textColor=C_TITLE,
             alignment=TA_JUSTIFY,
             leftIndent=10,
             rightIndent=10
         ))
 
         # Highlight style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='HighlightText',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=12,
             spaceAfter=12,
-            textColor=colors.HexColor('#e74c3c'),
+            textColor=C_HIGHLIGHT,
             fontName='Helvetica-Bold',
             leftIndent=10
         ))
 
         # Info box style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='InfoBox',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
             spaceAfter=12,
-            textColor=colors.HexColor('#2980b9'),
+            textColor=C_INFO,
             borderWidth=1,
-            borderColor=colors.HexColor('#3498db'),
+            borderColor=C_BLUE,
             borderPadding=10,
-            backColor=colors.HexColor('#ebf3fd'),
+            backColor=C_INFO_BG,
             leftIndent=5,
             rightIndent=5
         ))
 
-    def generate_pdf_report(self, classification, output_path=None):
+        return styles
+
+    def generate_pdf_report(self, classification, output_path=None, buffer=None):
         """
         Generate a comprehensive PDF report for waste classification
 
         Args:
             classification: WasteClassification model instance
             output_path: Optional file path to save PDF (if None, returns BytesIO)
+            buffer: Optional writable file-like object to render the PDF into
 
         Returns:
-            BytesIO buffer or saves to file
+            BytesIO buffer, the given buffer rewound to the start, or saves to file
         """
+        use_pooled_buffer = not output_path and buffer is None
         if output_path:
             buffer = open(output_path, 'wb')
-        else:
-            buffer = BytesIO()
+        elif use_pooled_buffer:
+            buffer = getattr(_render_local, 'buffer', None)
+            if buffer is None:
+                buffer = _render_local.buffer = BytesIO()
+            buffer.seek(0)
+            buffer.truncate()
 
         # Create PDF document
-        doc = SimpleDocTemplate(
+        doc = BaseDocTemplate(
             buffer,
             pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
+            rightMargin=PAGE_MARGIN,
+            leftMargin=PAGE_MARGIN,
+            topMargin=PAGE_MARGIN,
+            bottomMargin=PAGE_MARGIN
         )
+        doc.addPageTemplates([_get_page_template()])
 
         # Build the PDF content
         story = []
@@ -132,10 +286,7 @@ class WasteClassificationPDFGenerator:
         self._add_classification_summary(story, classification)
 
         # Add detailed sections
-        self._add_disposal_section(story, classification)
-        self._add_risk_assessment_section(story, classification)
-        self._add_safety_measures_section(story, classification)
-        self._add_additional_info_section(story, classification)
+        self._add_sections(story, classification)
 
         # Add footer
         self._add_footer(story, classification)
@@ -146,6 +297,9 @@ class WasteClassificationPDFGenerator:
         if output_path:
             buffer.close()
             return output_path
+        elif use_pooled_buffer:
+            # Hand out a private copy so the pooled buffer is never shared with callers
+            return BytesIO(buffer.getvalue())
         else:
             buffer.seek(0)
             return buffer
@@ -154,90 +308,54 @@ class WasteClassificationPDFGenerator:
         """Add report header with title and basic info"""
         # Main title
         title = Paragraph("🗑️ Waste Analysis Report", self.styles['CustomTitle'])
-        story.append(title)
-        story.append(Spacer(1, 20))
 
         # Report info table
         report_data = [
-            ['Report Generated:', datetime.datetime.now().strftime('%B %d, %Y at %I:%M %p')],
-            ['Analysis Date:', classification.created_at.strftime('%B %d, %Y at %I:%M %p')],
+            ['Report Generated:', datetime.datetime.now().strftime(TS_FMT)],
+            ['Analysis Date:', classification.created_at.strftime(TS_FMT)],
             ['State/Region:', classification.get_state_display()],
             ['Report ID:', f"WR-{classification.id:06d}"]
         ]
 
         report_table = Table(report_data, colWidths=[2*inch, 3*inch])
-        report_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#ecf0f1')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bdc3c7')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ]))
-
-        story.append(report_table)
-        story.append(Spacer(1, 30))
+        report_table.setStyle(REPORT_TABLE_STYLE)
+
+        story.extend([title, Spacer(1, 20), report_table, Spacer(1, 30)])
 
     def _add_waste_image(self, story, classification):
         """Add the analyzed waste image to the report"""
         try:
-            if classification.image and os.path.exists(classification.image.path):
-                # Open and resize image
-                pil_img = PILImage.open(classification.image.path)
-
-                # Calculate dimensions to fit within 4 inches width
-                max_width = 4 * inch
-                max_height = 3 * inch
-
-                img_width, img_height = pil_img.size
-                aspect_ratio = img_height / img_width
-
-                if img_width > max_width / 72:  # Convert to points
-                    new_width = max_width
-                    new_height = new_width * aspect_ratio
-                    if new_height > max_height:
-                        new_height = max_height
-                        new_width = new_height / aspect_ratio
-                else:
-                    new_width = img_width * 72 / 72  # Convert to points
-                    new_height = img_height * 72 / 72
-
-                # Add image to story
-                img = Image(classification.image.path, width=new_width, height=new_height)
-
-                # Center the image
-                story.append(Paragraph("📸 Analyzed Waste Image", self.styles['SectionHeader']))
-                story.append(Spacer(1, 10))
+            if classification.image:
+                # Let ReportLab fit the thumbnail within 4" x 3", keeping its aspect ratio
+                thumbnail = get_or_create_thumbnail(classification)
+                img = Image(thumbnail, width=4*inch, height=3*inch, kind='proportional')
 
                 # Create a table to center the image
                 img_table = Table([[img]], colWidths=[6*inch])
-                img_table.setStyle(TableStyle([
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ]))
+                img_table.setStyle(IMAGE_TABLE_STYLE)
 
-                story.append(img_table)
-                story.append(Spacer(1, 20))
+                story.extend([
+                    Paragraph("📸 Analyzed Waste Image", self.styles['SectionHeader']),
+                    Spacer(1, 10),
+                    img_table,
+                    Spacer(1, 20),
+                ])
 
         except Exception as e:
+            # A missing upload just leaves the image section out of the report
+            if not classification.image.storage.exists(classification.image.name):
+                return
+
             # If image processing fails, add a note
             logger.warning(f"Could not add image to PDF: {e}")
-            story.append(Paragraph("📸 Image Analysis", self.styles['SectionHeader']))
-            story.append(Paragraph(
-                "Note: Could not include waste image in report.",
-                self.styles['InfoBox']
-            ))
-            story.append(Spacer(1, 20))
+            story.extend([
+                Paragraph("📸 Image Analysis", self.styles['SectionHeader']),
+                Paragraph("Note: Could not include waste image in report.", self.styles['InfoBox']),
+                Spacer(1, 20),
+            ])
 
     def _add_classification_summary(self, story, classification):
         """Add classification results summary"""
-        story.append(Paragraph("🔍 Classification Summary", self.styles['SectionHeader']))
-
         # Classification details table
         confidence_percent = round(classification.confidence_score * 100, 2) if classification.confidence_score else 0
 
@@ -248,93 +366,63 @@ class WasteClassificationPDFGenerator:
         ]
 
         summary_table = Table(summary_data, colWidths=[1.5*inch, 4*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#2ecc71')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#d5f4e6')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#27ae60')),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-
-        story.append(summary_table)
-        story.append(Spacer(1, 25))
-
-    def _add_disposal_section(self, story, classification):
-        """Add disposal instructions section"""
-        story.append(Paragraph("🗑️ Disposal Instructions", self.styles['SectionHeader']))
-
-        if classification.disposal_instructions:
-            story.append(Paragraph("General Disposal Method:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.disposal_instructions, self.styles['ContentText']))
-
-        if classification.state_specific_laws:
-            story.append(Paragraph("⚖️ State-Specific Regulations:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.state_specific_laws, self.styles['ContentText']))
-
-        if classification.authorized_facilities:
-            story.append(Paragraph("🏢 Authorized Facilities:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.authorized_facilities, self.styles['ContentText']))
-
-        story.append(Spacer(1, 20))
-
-    def _add_risk_assessment_section(self, story, classification):
-        """Add risk assessment section"""
-        story.append(Paragraph("⚠️ Risk Assessment", self.styles['SectionHeader']))
-
-        if classification.health_hazards:
-            story.append(Paragraph("🏥 Health Hazards:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.health_hazards, self.styles['ContentText']))
-
-        if classification.environmental_risks:
-            story.append(Paragraph("🌍 Environmental Risks:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.environmental_risks, self.styles['ContentText']))
-
-        story.append(Spacer(1, 20))
-
-    def _add_safety_measures_section(self, story, classification):
-        """Add safety measures section"""
-        story.append(Paragraph("🛡️ Safety Measures", self.styles['SectionHeader']))
-
-        if classification.precautions:
-            story.append(Paragraph("⚠️ Precautions:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.precautions, self.styles['ContentText']))
-
-        if classification.protective_equipment:
-            story.append(Paragraph("🥽 Protective Equipment:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.protective_equipment, self.styles['ContentText']))
-
-        if classification.emergency_procedures:
-            story.append(Paragraph("🚨 Emergency Procedures:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.emergency_procedures, self.styles['ContentText']))
-
-        story.append(Spacer(1, 20))
-
-    def _add_additional_info_section(self, story, classification):
-        """Add additional information section"""
-        story.append(Paragraph("📋 Additional Information", self.styles['SectionHeader']))
-
-        if classification.recyclability_info:
-            story.append(Paragraph("♻️ Recyclability Information:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.recyclability_info, self.styles['ContentText']))
-
-        if classification.cost_implications:
-            story.append(Paragraph("💰 Cost Implications:", self.styles['HighlightText']))
-            story.append(Paragraph(classification.cost_implications, self.styles['ContentText']))
-
-        story.append(Spacer(1, 20))
-
-    def _add_footer(self, story, classification):
-        """Add report footer with disclaimer and contact info"""
-        story.append(Spacer(1, 30))
-
+        summary_table.setStyle(SUMMARY_TABLE_STYLE)
+
+        story.extend([
+            Paragraph("🔍 Classification Summary", self.styles['SectionHeader']),
+            summary_table,
+            Spacer(1, 25),
+        ])
+
+    # Report sections as (heading, ((field label, model field), ...)); fields
+    # left empty by the analysis are skipped
+    _SECTIONS = (
+        ("🗑️ Disposal Instructions", (
+            ("General Disposal Method:", 'disposal_instructions'),
+            ("⚖️ State-Specific Regulations:", 'state_specific_laws'),
+            ("🏢 Authorized Facilities:", 'authorized_facilities'),
+        )),
+        ("⚠️ Risk Assessment", (
+            ("🏥 Health Hazards:", 'health_hazards'),
+            ("🌍 Environmental Risks:", 'environmental_risks'),
+        )),
+        ("🛡️ Safety Measures", (
+            ("⚠️ Precautions:", 'precautions'),
+            ("🥽 Protective Equipment:", 'protective_equipment'),
+            ("🚨 Emergency Procedures:", 'emergency_procedures'),
+        )),
+        ("📋 Additional Information", (
+            ("♻️ Recyclability Information:", 'recyclability_info'),
+            ("💰 Cost Implications:", 'cost_implications'),
+        )),
+    )
+
+    def _add_sections(self, story, classification):
+        """Add the disposal, risk, safety and additional information sections"""
+        section_header = self.styles['SectionHeader']
+        highlight = self.styles['HighlightText']
+        content = self.styles['ContentText']
+
+        flowables = []
+        for heading, fields in self._SECTIONS:
+            flowables.append(Paragraph(heading, section_header))
+
+            # Keep each label with its text so the page splitter treats them as one item
+            for label, field in fields:
+                value = getattr(classification, field)
+                if value:
+                    flowables.append(KeepTogether([
+                        Paragraph(label, highlight),
+                        Paragraph(value, content),
+                    ]))
+
+            flowables.append(Spacer(1, 20))
+
+        story.extend(flowables)
+
+    @staticmethod
+    def _build_footer(styles):
+        """Create the disclaimer and contact flowables that end every report"""
         # Disclaimer
         disclaimer_text = """
         <b>Disclaimer:</b> This analysis is generated using AI technology and is provided for informational purposes only.
@@ -342,24 +430,44 @@ class WasteClassificationPDFGenerator:
         The accuracy of this analysis depends on the quality of the provided image and may not be 100% accurate in all cases.
         """
 
-        story.append(Paragraph("⚖️ Important Disclaimer", self.styles['SectionHeader']))
-        story.append(Paragraph(disclaimer_text, self.styles['InfoBox']))
-
         # Contact information
         contact_text = """
         For more information about waste disposal in your area, contact your local municipal corporation or
         visit the official website of the Pollution Control Board in your state.
         """
 
-        story.append(Paragraph("📞 Contact Information", self.styles['SectionHeader']))
-        story.append(Paragraph(contact_text, self.styles['ContentText']))
+        return (
+            Spacer(1, 30),
+            Paragraph("⚖️ Important Disclaimer", styles['SectionHeader']),
+            Paragraph(disclaimer_text, styles['InfoBox']),
+            Paragraph("📞 Contact Information", styles['SectionHeader']),
+            Paragraph(contact_text, styles['ContentText']),
+            # Report end
+            Spacer(1, 20),
+            Paragraph("--- End of Report (Generated by EcoWaste AI) ---", styles['InfoBox']),
+        )
 
-        # Report end
-        story.append(Spacer(1, 20))
-        story.append(Paragraph(
-            f"--- End of Report (Generated by EcoWaste AI) ---",
-            self.styles['InfoBox']
-        ))
+    def _add_footer(self, story, classification):
+        """Add report footer with disclaimer and contact info"""
+        # Flowables keep layout state while a document builds, so each report
+        # gets shallow copies that share the already-parsed text
+        story.extend(copy.copy(flowable) for flowable in self._FOOTER)
+
+
+def report_storage_dir(classification):
+    """Return the storage directory holding every report revision of a classification"""
+    return f"reports/{classification.id}"
+
+
+def report_storage_name(classification):
+    """
+    Return the storage path of the built report for a classification
+
+    The path includes updated_at, so a re-analysis gets a new report file.
+    """
+    revision = int(classification.updated_at.timestamp())
+    filename = f"waste_analysis_report_{classification.id}_{classification.created_at.strftime('%Y%m%d')}.pdf"
+    return f"{report_storage_dir(classification)}/{revision}/{filename}"
 
 
 def generate_waste_classification_pdf(classification):
@@ -1,31 +1,74 @@
 from rest_framework import serializers
 from .models import WasteClassification
+from .constants import IMAGE_SIGNATURES, MAX_IMAGE_UPLOAD_SIZE
+
+# Formats timestamps the same way DRF's DateTimeField would
+_DATETIME_FIELD = serializers.DateTimeField()
 
 class WasteClassificationSerializer(serializers.ModelSerializer):
     state_display = serializers.CharField(source='get_state_display', read_only=True)
     category_display = serializers.CharField(source='get_predicted_category_display', read_only=True)
 
+    # Plain text/number fields copied straight onto the output by to_representation
+    VALUE_FIELDS = (
+        'id', 'state', 'predicted_category', 'confidence_score', 'waste_description',
+        'disposal_instructions', 'state_specific_laws', 'authorized_facilities',
+        'health_hazards', 'environmental_risks', 'precautions',
+        'protective_equipment', 'emergency_procedures', 'recyclability_info',
+        'cost_implications', 'status', 'error_message'
+    )
+
     class Meta:
         model = WasteClassification
-        fields = '__all__'
+        fields = (
+            'id', 'image', 'state', 'state_display', 'predicted_category',
+            'category_display', 'confidence_score', 'waste_description',
+            'disposal_instructions', 'state_specific_laws', 'authorized_facilities',
+            'health_hazards', 'environmental_risks', 'precautions',
+            'protective_equipment', 'emergency_procedures', 'recyclability_info',
+            'cost_implications', 'status', 'error_message', 'created_at', 'updated_at'
+        )
         read_only_fields = [
             'predicted_category', 'confidence_score', 'waste_description',
             'disposal_instructions', 'state_specific_laws', 'authorized_facilities',
             'health_hazards', 'environmental_risks', 'precautions',
             'protective_equipment', 'emergency_procedures', 'recyclability_info',
-            'cost_implications', 'gemini_raw_response', 'created_at', 'updated_at'
+            'cost_implications', 'status', 'error_message', 'created_at', 'updated_at'
         ]
 
+    def to_representation(self, instance):
+        """Build the output dict directly instead of dispatching through each field"""
+        data = {field: getattr(instance, field) for field in self.VALUE_FIELDS}
+
+        image_url = None
+        if instance.image:
+            image_url = instance.image.url
+            request = self.context.get('request')
+            if request is not None:
+                image_url = request.build_absolute_uri(image_url)
+        data['image'] = image_url
+
+        data['state_display'] = instance.get_state_display()
+        data['category_display'] = instance.get_predicted_category_display()
+        data['created_at'] = _DATETIME_FIELD.to_representation(instance.created_at)
+        data['updated_at'] = _DATETIME_FIELD.to_representation(instance.updated_at)
+        return data
+
 class WasteAnalysisInputSerializer(serializers.Serializer):
     image = serializers.ImageField(required=True)
     state = serializers.ChoiceField(choices=WasteClassification.INDIAN_STATES, required=True)
 
     def validate_image(self, value):
         """Validate image file"""
-        if value.size > 10 * 1024 * 1024:  # 10MB limit
+        if value.size > MAX_IMAGE_UPLOAD_SIZE:
             raise serializers.ValidationError("Image size should not exceed 10MB")
 
-        if not value.content_type.startswith('image/'):
+        # Check the file signature rather than trusting the client-supplied content type
+        value.seek(0)
+        header = value.read(16)
+        value.seek(0)
+        is_webp = header[:4] == b'RIFF' and header[8:12] == b'WEBP'
+        if not (is_webp or header.startswith(IMAGE_SIGNATURES)):
             raise serializers.ValidationError("File must be an image")
 
         return value
@@ -0,0 +1,351 @@
+import logging
+
+from celery import shared_task
+from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .constants import INDIAN_STATES_DICT
+from .models import WasteClassification, BatchJob
+from .gemini_service import get_analyzer, parse_gemini_response, shrink_stored_image
+from .pdf_report import (
+    REPORT_FIELDS, get_or_create_thumbnail, generate_waste_classification_pdf,
+    report_storage_dir, report_storage_name
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows streamed and bulk-updated per round trip in bulk tasks
+BULK_CHUNK_SIZE = 500
+
+# Fields written back after a Gemini analysis, for bulk_update and update_fields
+ANALYSIS_FIELDS = [
+    'predicted_category', 'confidence_score', 'waste_description',
+    'disposal_instructions', 'state_specific_laws', 'authorized_facilities',
+    'health_hazards', 'environmental_risks', 'precautions',
+    'protective_equipment', 'emergency_procedures', 'recyclability_info',
+    'cost_implications', 'gemini_raw_response_zst', 'status', 'error_message',
+    'updated_at'
+]
+
+# Seconds a queued report build blocks further builds of the same report
+REPORT_BUILD_LOCK_TIMEOUT = 60
+
+# Fields written when an analysis fails
+FAILURE_FIELDS = ['status', 'error_message', 'updated_at']
+
+# Fields written when Gemini replied but the reply could not be parsed
+UNPARSED_FIELDS = FAILURE_FIELDS + ['gemini_raw_response_zst']
+
+
+# (model field, response section, response key, default) for each analysis value
+_FIELD_MAP = (
+    ('predicted_category', 'waste_classification', 'category', 'GENERAL'),
+    ('confidence_score', 'waste_classification', 'confidence', 0.5),
+    ('waste_description', 'waste_classification', 'description', ''),
+    ('disposal_instructions', 'disposal_instructions', 'general_method', ''),
+    ('state_specific_laws', 'disposal_instructions', 'state_specific_laws', ''),
+    ('authorized_facilities', 'disposal_instructions', 'authorized_facilities', ''),
+    ('health_hazards', 'risk_assessment', 'health_hazards', ''),
+    ('environmental_risks', 'risk_assessment', 'environmental_risks', ''),
+    ('precautions', 'safety_measures', 'precautions', ''),
+    ('protective_equipment', 'safety_measures', 'protective_equipment', ''),
+    ('emergency_procedures', 'safety_measures', 'emergency_procedures', ''),
+    ('recyclability_info', 'additional_info', 'recyclability', ''),
+    ('cost_implications', 'additional_info', 'cost_implications', ''),
+)
+
+
+def apply_analysis_data(waste_classification, data):
+    """Copy parsed Gemini analysis data onto a WasteClassification instance"""
+    for field, section, key, default in _FIELD_MAP:
+        setattr(waste_classification, field, data.get(section, {}).get(key, default))
+
+    # Batch results skip the schema validator, so guard the confidence here too;
+    # type() rather than isinstance() keeps bools out, and c != c catches NaN
+    confidence = waste_classification.confidence_score
+    if type(confidence) not in (int, float) or confidence != confidence or not 0.0 <= confidence <= 1.0:
+        confidence = 0.5
+    waste_classification.confidence_score = float(confidence)
+
+
+def _apply_raw_response(waste_classification, raw_response):
+    """
+    Parse a raw Gemini reply onto an unsaved instance, ready for bulk_update
+
+    Returns:
+        The fields that were set, so deferred fields are never read back
+    """
+    try:
+        data = parse_gemini_response(raw_response)
+    except ValueError as e:
+        logger.error(f"JSON parsing error for classification {waste_classification.pk}: {e}")
+        return _record_failure(waste_classification, 'Failed to parse API response as JSON', raw_response)
+
+    return _apply_analysis(waste_classification, data, raw_response)
+
+
+def _apply_analysis(waste_classification, data, raw_response):
+    """
+    Set a parsed Gemini analysis on an unsaved instance, ready for bulk_update
+
+    Returns:
+        The fields that were set
+    """
+    apply_analysis_data(waste_classification, data)
+    waste_classification.gemini_raw_response = raw_response
+    waste_classification.status = 'COMPLETED'
+    waste_classification.error_message = ''
+    waste_classification.updated_at = timezone.now()
+    return ANALYSIS_FIELDS
+
+
+def _record_failure(waste_classification, error, raw_response=None):
+    """
+    Record a failed analysis on an unsaved instance, ready for bulk_update
+
+    A row that already holds a completed analysis keeps it; only the error is
+    recorded, so a failed re-run never throws away a good result. Otherwise a
+    reply Gemini did send is kept for debugging.
+
+    Returns:
+        The fields that were set
+    """
+    waste_classification.error_message = error
+    if waste_classification.status == 'COMPLETED':
+        logger.warning("Keeping completed analysis for classification %s: %s", waste_classification.pk, error)
+        return ['error_message']
+
+    waste_classification.status = 'FAILED'
+    waste_classification.updated_at = timezone.now()
+    if raw_response is None:
+        return FAILURE_FIELDS
+
+    waste_classification.gemini_raw_response = raw_response
+    return UNPARSED_FIELDS
+
+
+def _bulk_update_grouped(updates):
+    """
+    bulk_update rows grouped by the fields changed on them, then empty the groups
+
+    Args:
+        updates: Dict of field tuple -> WasteClassification instances
+
+    Returns:
+        Number of rows written
+    """
+    updated_count = 0
+    for fields, waste_classifications in updates.items():
+        WasteClassification.objects.bulk_update(waste_classifications, fields, batch_size=BULK_CHUNK_SIZE)
+        updated_count += len(waste_classifications)
+    updates.clear()
+    return updated_count
+
+
+@shared_task(bind=True, rate_limit="60/m")
+def analyze_waste_task(self, classification_id):
+    """
+    Analyze a stored waste image with Gemini and write the results back
+
+    Args:
+        classification_id: Primary key of the WasteClassification to analyze
+    """
+    try:
+        waste_classification = WasteClassification.objects.get(pk=classification_id)
+    except WasteClassification.DoesNotExist:
+        logger.error(f"Waste classification {classification_id} no longer exists")
+        return
+
+    try:
+        analyzer = get_analyzer()
+        state_name = INDIAN_STATES_DICT.get(waste_classification.state, waste_classification.state)
+
+        # Keep only a Gemini-sized copy of the upload; the original is never needed again
+        try:
+            shrink_stored_image(waste_classification.image.path)
+        except Exception as e:
+            logger.warning(f"Could not shrink stored image: {e}")
+
+        analysis_result = analyzer.analyze_waste_image(
+            image_path=waste_classification.image.path,
+            state_code=waste_classification.state,
+            state_name=state_name
+        )
+
+        if not analysis_result['success']:
+            waste_classification.status = 'FAILED'
+            waste_classification.error_message = analysis_result['error']
+            # Keep a reply Gemini did send (unparsable or malformed) for debugging
+            if analysis_result.get('raw_response') is not None:
+                waste_classification.gemini_raw_response = analysis_result['raw_response']
+                waste_classification.save(update_fields=UNPARSED_FIELDS)
+            else:
+                waste_classification.save(update_fields=FAILURE_FIELDS)
+            return
+
+        # The analyzer has already parsed and validated the reply
+        apply_analysis_data(waste_classification, analysis_result['data'])
+        waste_classification.gemini_raw_response = analysis_result['raw_response']
+        waste_classification.status = 'COMPLETED'
+        waste_classification.error_message = ''
+        waste_classification.save(update_fields=ANALYSIS_FIELDS)
+
+        # Warm the PDF report thumbnail so the first download skips the full-size decode
+        try:
+            get_or_create_thumbnail(waste_classification)
+        except Exception as e:
+            logger.warning(f"Could not create report thumbnail: {e}")
+
+    except Exception as e:
+        logger.error(f"Waste analysis task error: {e}")
+        waste_classification.status = 'FAILED'
+        waste_classification.error_message = f'Analysis failed: {str(e)}'
+        waste_classification.save(update_fields=FAILURE_FIELDS)
+
+
+@shared_task
+def poll_batch_jobs():
+    """Store results of finished Gemini batch jobs (run periodically by celery beat)"""
+    pending_jobs = list(BatchJob.objects.exclude(state__in=BatchJob.FINISHED_STATES))
+    if not pending_jobs:
+        return
+
+    analyzer = get_analyzer()
+
+    for batch_job in pending_jobs:
+        try:
+            result = analyzer.get_batch_results(batch_job)
+        except Exception as e:
+            logger.error(f"Could not fetch Gemini batch {batch_job.name}: {e}")
+            continue
+
+        batch_job.state = result['state']
+        batch_job.save()
+
+        if batch_job.state not in BatchJob.FINISHED_STATES:
+            continue
+
+        if batch_job.state == 'JOB_STATE_SUCCEEDED':
+            missing_error = 'No response in Gemini batch results'
+        else:
+            missing_error = f'Gemini batch finished with {batch_job.state}'
+
+        # Stream rows so large batches don't load every classification at once; only
+        # the fields each row had set are written back
+        classifications = WasteClassification.objects.only('id', 'status').filter(
+            pk__in=batch_job.classification_ids
+        )
+        updates = {}
+        buffered_count = 0
+        stored_count = 0
+        for waste_classification in classifications.iterator(chunk_size=BULK_CHUNK_SIZE):
+            raw_response = result['responses'].get(str(waste_classification.pk))
+            if raw_response is None:
+                fields = _record_failure(waste_classification, missing_error)
+            else:
+                fields = _apply_raw_response(waste_classification, raw_response)
+
+            updates.setdefault(tuple(fields), []).append(waste_classification)
+            buffered_count += 1
+            if buffered_count >= BULK_CHUNK_SIZE:
+                stored_count += _bulk_update_grouped(updates)
+                buffered_count = 0
+
+        stored_count += _bulk_update_grouped(updates)
+
+        logger.info(f"Stored {stored_count} results from Gemini batch {batch_job.name}")
+
+
+@shared_task
+def reanalyze_waste_task(classification_ids):
+    """Re-analyze several classifications with concurrent Gemini calls"""
+    classifications = list(WasteClassification.objects.only('id', 'image', 'state', 'status').filter(pk__in=classification_ids))
+    analyzer = get_analyzer()
+
+    analysis_results = analyzer.analyze_many([
+        {
+            'image_path': waste_classification.image.path,
+            'state_code': waste_classification.state,
+            'state_name': INDIAN_STATES_DICT.get(waste_classification.state, waste_classification.state)
+        }
+        for waste_classification in classifications
+    ])
+
+    updates = {}
+    for waste_classification, analysis_result in zip(classifications, analysis_results):
+        if analysis_result['success']:
+            fields = _apply_analysis(waste_classification, analysis_result['data'], analysis_result['raw_response'])
+        else:
+            fields = _record_failure(waste_classification, analysis_result['error'])
+        updates.setdefault(tuple(fields), []).append(waste_classification)
+
+    _bulk_update_grouped(updates)
+    logger.info(f"Re-analyzed {len(classifications)} classifications")
+
+
+@shared_task
+def submit_batch_task(classification_ids):
+    """Submit classifications to Gemini Batch Mode; poll_batch_jobs stores the results"""
+    # Only the image and state are needed to build batch requests
+    classifications = WasteClassification.objects.only('id', 'image', 'state').filter(pk__in=classification_ids)
+    batch_job = get_analyzer().submit_batch(classifications.iterator(chunk_size=BULK_CHUNK_SIZE))
+    return batch_job.name
+
+
+def _delete_old_reports(classification, storage_name):
+    """Delete reports built for earlier revisions of a classification"""
+    report_dir = report_storage_dir(classification)
+    current_revision = storage_name.split('/')[-2]
+    try:
+        revisions, _ = default_storage.listdir(report_dir)
+    except FileNotFoundError:
+        return
+
+    for revision in revisions:
+        if revision == current_revision:
+            continue
+        _, filenames = default_storage.listdir(f"{report_dir}/{revision}")
+        for filename in filenames:
+            default_storage.delete(f"{report_dir}/{revision}/{filename}")
+
+
+@shared_task
+def build_report_task(classification_id):
+    """Render the PDF report for a classification and save it to media storage"""
+    try:
+        waste_classification = WasteClassification.objects.only(*REPORT_FIELDS).get(pk=classification_id)
+    except WasteClassification.DoesNotExist:
+        logger.error(f"Waste classification {classification_id} no longer exists")
+        return
+
+    # A build queued before the lock expired may already have written the report
+    storage_name = report_storage_name(waste_classification)
+    if default_storage.exists(storage_name):
+        return
+
+    pdf_buffer = generate_waste_classification_pdf(waste_classification)
+    saved_name = default_storage.save(storage_name, ContentFile(pdf_buffer.getvalue()))
+
+    # Storage renames the file if a concurrent build saved first; keep only that copy
+    if saved_name != storage_name:
+        default_storage.delete(saved_name)
+        return
+
+    _delete_old_reports(waste_classification, storage_name)
+    logger.info(f"Built PDF report {storage_name}")
+
+
+def queue_report_build(classification):
+    """
+    Queue build_report_task for a classification's report, unless one is already queued
+
+    Download pages poll until the report exists, so without the lock every
+    poll would queue another build of the same file.
+    """
+    lock_key = f"wcpdf-build:{report_storage_name(classification)}"
+    # add() returns None rather than False when the cache is unreachable; queue anyway then
+    if cache.add(lock_key, 1, REPORT_BUILD_LOCK_TIMEOUT) is False:
+        return
+    build_report_task.delay(classification.id)
@@ -1,3 +1,736 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+import imagehash
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db.models.fields.files import FieldFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .gemini_service import (
+    GEMINI_MAX_IMAGE_EDGE, GeminiWasteAnalyzer, _phash_band_keys, parse_gemini_response, shrink_stored_image
+)
+from .models import BatchJob, WasteClassification
+from .pdf_report import THUMBNAIL_SIZE, get_or_create_thumbnail, report_storage_name
+from .tasks import (
+    analyze_waste_task, apply_analysis_data, build_report_task, poll_batch_jobs, reanalyze_waste_task,
+    submit_batch_task
+)
+from .views import WasteAnalysisView
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+def make_image_bytes(size=(64, 48), image_format='JPEG'):
+    """Encode a small solid-colour test image"""
+    buffer = BytesIO()
+    Image.new('RGB', size, (40, 160, 60)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_upload(content=None, name='waste.jpg'):
+    return SimpleUploadedFile(name, make_image_bytes() if content is None else content, content_type='image/jpeg')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class WasteClassifierTestCase(TestCase):
+    """Base test case with a throwaway media root and an empty in-process cache"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='waste_mitra_test_media_')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        cache.clear()
+
+    def create_classification(self, **kwargs):
+        kwargs.setdefault('state', 'MH')
+        kwargs.setdefault('image', SimpleUploadedFile('waste.jpg', make_image_bytes()))
+        return WasteClassification.objects.create(**kwargs)
+
+
+class AnalysisStatusAPITests(WasteClassifierTestCase):
+
+    def get_status(self, waste_classification):
+        return self.client.get(reverse('api:api_analyze_status', args=[waste_classification.pk]))
+
+    def test_pending_analysis(self):
+        waste_classification = self.create_classification()
+
+        response = self.get_status(waste_classification)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['data']['analysis_state'], 'pending')
+
+    def test_failed_analysis(self):
+        waste_classification = self.create_classification(status='FAILED', error_message='boom')
+
+        response = self.get_status(waste_classification)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertFalse(body['success'])
+        self.assertEqual(body['data']['analysis_state'], 'error')
+        self.assertEqual(body['error'], 'boom')
+
+    def test_completed_analysis(self):
+        waste_classification = self.create_classification(
+            status='COMPLETED', predicted_category='MEDICAL', confidence_score=0.875
+        )
+
+        response = self.get_status(waste_classification)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['analysis_state'], 'done')
+        self.assertEqual(data['state'], 'MH')
+        self.assertEqual(data['waste_category'], 'MEDICAL')
+        self.assertEqual(data['confidence_score'], 87.5)
+
+    @mock.patch('waste_classifier.views.analyze_waste_task.delay')
+    def test_upload_returns_poll_url(self, delay):
+        delay.return_value.id = 'task-1'
+
+        response = self.client.post(reverse('api:api_analyze'), {'image': make_upload(), 'state': 'MH'})
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()['data']
+        self.assertEqual(data['analysis_state'], 'pending')
+        self.assertEqual(data['task_id'], 'task-1')
+        delay.assert_called_once_with(data['id'])
+
+        poll = self.client.get(data['poll_url'])
+        self.assertEqual(poll.json()['data']['analysis_state'], 'pending')
+
+    def test_unknown_classification(self):
+        response = self.client.get(reverse('api:api_analyze_status', args=[999]))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class PHashBandTests(TestCase):
+
+    def test_near_duplicates_share_a_band(self):
+        phash = imagehash.hex_to_hash('f0e1d2c3b4a59687')
+        keys = set(_phash_band_keys(phash, 'MH'))
+        value = int(str(phash), 16)
+
+        for flipped_bits in ((0, 1, 2, 3), (0, 16, 32, 48), (11, 12, 25, 38), (60, 61, 62, 63)):
+            near = value
+            for bit in flipped_bits:
+                near ^= 1 << bit
+            near_keys = _phash_band_keys(imagehash.hex_to_hash(f"{near:016x}"), 'MH')
+            self.assertTrue(keys.intersection(near_keys), flipped_bits)
+
+    def test_bands_are_per_state(self):
+        phash = imagehash.hex_to_hash('f0e1d2c3b4a59687')
+
+        self.assertFalse(set(_phash_band_keys(phash, 'MH')) & set(_phash_band_keys(phash, 'KA')))
+
+
+def make_analysis(category='RECYCLABLE', confidence=0.9):
+    """A complete parsed Gemini analysis"""
+    return {
+        'waste_classification': {'category': category, 'confidence': confidence, 'description': 'Plastic bottle'},
+        'disposal_instructions': {'general_method': 'Recycle'},
+        'risk_assessment': {'health_hazards': 'None'},
+        'safety_measures': {'precautions': 'Rinse'},
+        'additional_info': {'recyclability': 'High'},
+    }
+
+
+def make_gemini_reply(category='RECYCLABLE', confidence=0.9):
+    """A fenced Gemini reply that parses into a complete analysis"""
+    return '```json\n' + json.dumps(make_analysis(category, confidence)) + '\n```'
+
+
+class PollBatchJobsTests(WasteClassifierTestCase):
+
+    def run_batch(self, responses_by_row):
+        """Finish a batch with the given reply (or None) per row; return the rows and query count"""
+        rows = [self.create_classification() for _ in responses_by_row]
+        batch_job = BatchJob.objects.create(name='batches/test', classification_ids=[row.pk for row in rows])
+        analyzer = mock.Mock()
+        analyzer.get_batch_results.return_value = {
+            'state': 'JOB_STATE_SUCCEEDED',
+            'responses': {
+                str(row.pk): reply for row, reply in zip(rows, responses_by_row) if reply is not None
+            },
+        }
+
+        with mock.patch('waste_classifier.tasks.get_analyzer', return_value=analyzer), \
+                self.assertLogs('waste_classifier', level='INFO'), \
+                CaptureQueriesContext(connection) as queries:
+            poll_batch_jobs()
+
+        batch_job.refresh_from_db()
+        self.assertEqual(batch_job.state, 'JOB_STATE_SUCCEEDED')
+        for row in rows:
+            row.refresh_from_db()
+        return rows, len(queries)
+
+    def test_results_are_stored_per_outcome(self):
+        rows, _ = self.run_batch([make_gemini_reply(), None, 'not json'])
+
+        self.assertEqual(rows[0].status, 'COMPLETED')
+        self.assertEqual(rows[0].predicted_category, 'RECYCLABLE')
+        self.assertEqual(rows[0].confidence_score, 0.9)
+        self.assertEqual(rows[1].status, 'FAILED')
+        self.assertEqual(rows[1].error_message, 'No response in Gemini batch results')
+        self.assertIsNone(rows[1].gemini_raw_response)
+        self.assertEqual(rows[2].status, 'FAILED')
+        self.assertEqual(rows[2].error_message, 'Failed to parse API response as JSON')
+        self.assertEqual(rows[2].gemini_raw_response, 'not json')
+
+    def test_query_count_does_not_grow_with_rows(self):
+        _, few_queries = self.run_batch([make_gemini_reply(), None, 'not json'])
+        BatchJob.objects.all().delete()
+        _, many_queries = self.run_batch([make_gemini_reply(), None, 'not json'] * 4)
+
+        self.assertEqual(few_queries, many_queries)
+
+    def test_expired_batch_keeps_completed_analyses(self):
+        completed = self.create_classification(status='COMPLETED', predicted_category='MEDICAL')
+        pending = self.create_classification()
+        batch_job = BatchJob.objects.create(name='batches/test', classification_ids=[completed.pk, pending.pk])
+        analyzer = mock.Mock()
+        analyzer.get_batch_results.return_value = {'state': 'JOB_STATE_EXPIRED', 'responses': {}}
+
+        with mock.patch('waste_classifier.tasks.get_analyzer', return_value=analyzer), \
+                self.assertLogs('waste_classifier', level='INFO'):
+            poll_batch_jobs()
+
+        completed.refresh_from_db()
+        self.assertEqual(completed.status, 'COMPLETED')
+        self.assertEqual(completed.predicted_category, 'MEDICAL')
+        self.assertEqual(completed.error_message, 'Gemini batch finished with JOB_STATE_EXPIRED')
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, 'FAILED')
+        batch_job.refresh_from_db()
+        self.assertEqual(batch_job.state, 'JOB_STATE_EXPIRED')
+
+
+class SubmitBatchTests(WasteClassifierTestCase):
+
+    def test_request_file_is_removed_when_an_image_fails_to_load(self):
+        temp_dir = tempfile.mkdtemp(prefix='waste_mitra_test_batch_')
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        analyzer = GeminiWasteAnalyzer.__new__(GeminiWasteAnalyzer)
+
+        with mock.patch('waste_classifier.gemini_service._get_batch_client') as get_client, \
+                mock.patch.object(analyzer, '_load_image', side_effect=OSError('unreadable')), \
+                mock.patch('tempfile.tempdir', temp_dir), \
+                self.assertRaises(OSError):
+            analyzer.submit_batch([self.create_classification()])
+
+        self.assertEqual(os.listdir(temp_dir), [])
+        get_client.return_value.files.upload.assert_not_called()
+        self.assertFalse(BatchJob.objects.exists())
+
+    def test_task_submits_the_requested_rows(self):
+        rows = [self.create_classification(state='MH'), self.create_classification(state='KA')]
+        self.create_classification(state='GA')
+        submitted = []
+
+        def submit_batch(classifications):
+            submitted.extend(classification.pk for classification in classifications)
+            return BatchJob(name='batches/test', classification_ids=submitted)
+
+        analyzer = mock.Mock()
+        analyzer.submit_batch.side_effect = submit_batch
+
+        with mock.patch('waste_classifier.tasks.get_analyzer', return_value=analyzer):
+            self.assertEqual(submit_batch_task([row.pk for row in rows]), 'batches/test')
+
+        self.assertCountEqual(submitted, [row.pk for row in rows])
+
+
+class ReanalyzeWasteTaskTests(WasteClassifierTestCase):
+
+    def test_results_and_failures_are_stored(self):
+        completed = self.create_classification(state='MH', status='FAILED', error_message='old error')
+        kept = self.create_classification(
+            state='KA', status='COMPLETED', predicted_category='MEDICAL', waste_description='Syringe'
+        )
+        failed = self.create_classification(state='GA', status='PENDING')
+        results_by_state = {
+            'MH': {
+                'success': True,
+                'data': make_analysis('E_WASTE', 0.75),
+                'raw_response': make_gemini_reply('E_WASTE', 0.75),
+            },
+            'KA': {'success': False, 'error': 'quota exceeded'},
+            'GA': {'success': False, 'error': 'quota exceeded'},
+        }
+        analyzer = mock.Mock()
+        analyzer.analyze_many.side_effect = lambda requests: [
+            results_by_state[request['state_code']] for request in requests
+        ]
+
+        with mock.patch('waste_classifier.tasks.get_analyzer', return_value=analyzer), \
+                self.assertLogs('waste_classifier', level='INFO'), \
+                CaptureQueriesContext(connection) as queries:
+            reanalyze_waste_task([completed.pk, kept.pk, failed.pk])
+
+        # Select the rows, then one bulk update per outcome; no per-row reloads
+        self.assertEqual(len(queries), 4)
+        self.assertIn('"image"', queries.captured_queries[0]['sql'])
+        self.assertNotIn('"waste_description"', queries.captured_queries[0]['sql'])
+
+        completed.refresh_from_db()
+        self.assertEqual(completed.status, 'COMPLETED')
+        self.assertEqual(completed.predicted_category, 'E_WASTE')
+        self.assertEqual(completed.error_message, '')
+
+        # A failed re-run records the error but keeps the completed analysis
+        kept.refresh_from_db()
+        self.assertEqual(kept.status, 'COMPLETED')
+        self.assertEqual(kept.error_message, 'quota exceeded')
+        self.assertEqual(kept.predicted_category, 'MEDICAL')
+        self.assertEqual(kept.waste_description, 'Syringe')
+
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, 'FAILED')
+        self.assertEqual(failed.error_message, 'quota exceeded')
+
+    def test_repeated_runs_in_one_process(self):
+        waste_classification = self.create_classification(state='MH', status='FAILED')
+        analyzer = GeminiWasteAnalyzer.__new__(GeminiWasteAnalyzer)
+        analyzer.model = mock.Mock()
+        analyzer.model.generate_content.side_effect = [
+            mock.Mock(text=make_gemini_reply('RECYCLABLE', 0.9)),
+            mock.Mock(text=make_gemini_reply('E_WASTE', 0.8)),
+        ]
+
+        with mock.patch('waste_classifier.tasks.get_analyzer', return_value=analyzer), \
+                mock.patch.object(analyzer, '_get_cached_analysis', return_value=None), \
+                mock.patch.object(analyzer, '_cache_analysis'), \
+                self.assertLogs('waste_classifier', level='INFO'):
+            reanalyze_waste_task([waste_classification.pk])
+            waste_classification.refresh_from_db()
+            self.assertEqual(waste_classification.predicted_category, 'RECYCLABLE')
+
+            reanalyze_waste_task([waste_classification.pk])
+            waste_classification.refresh_from_db()
+            self.assertEqual(waste_classification.predicted_category, 'E_WASTE')
+
+        self.assertEqual(waste_classification.status, 'COMPLETED')
+        self.assertEqual(analyzer.model.generate_content.call_count, 2)
+
+
+class ShrinkStoredImageTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='waste_mitra_test_shrink_')
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write_image(self, size, image_format, name):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as image_file:
+            image_file.write(make_image_bytes(size, image_format))
+        return path
+
+    def test_large_images_are_shrunk_in_place(self):
+        for image_format, name in (('JPEG', 'large.jpg'), ('PNG', 'large.png')):
+            path = self.write_image((4000, 3000), image_format, name)
+
+            self.assertTrue(shrink_stored_image(path))
+
+            with Image.open(path) as image:
+                self.assertEqual(max(image.size), GEMINI_MAX_IMAGE_EDGE)
+                self.assertEqual(image.format, image_format)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['large.jpg', 'large.png'])
+
+    def test_small_images_are_left_alone(self):
+        path = self.write_image((800, 600), 'JPEG', 'small.jpg')
+        with open(path, 'rb') as image_file:
+            original = image_file.read()
+
+        self.assertFalse(shrink_stored_image(path))
+
+        with open(path, 'rb') as image_file:
+            self.assertEqual(image_file.read(), original)
+
+    def test_failed_save_removes_the_temp_file(self):
+        path = self.write_image((4000, 3000), 'JPEG', 'large.jpg')
+
+        def partial_save(image, destination, *args, **kwargs):
+            with open(destination, 'wb') as partial_file:
+                partial_file.write(b'partial')
+            raise OSError('disk full')
+
+        with mock.patch.object(Image.Image, 'save', partial_save):
+            with self.assertRaises(OSError):
+                shrink_stored_image(path)
+
+        self.assertEqual(os.listdir(self.directory), ['large.jpg'])
+
+
+class ReportDownloadTests(WasteClassifierTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.classification = self.create_classification(
+            status='COMPLETED', predicted_category='RECYCLABLE', confidence_score=0.9,
+            waste_description='Plastic bottle', disposal_instructions='Recycle'
+        )
+
+    def build_report(self):
+        with self.assertLogs('waste_classifier', level='INFO'):
+            build_report_task(self.classification.pk)
+
+    def test_report_is_built_then_served_from_storage(self):
+        for url in (reverse('download_report', args=[self.classification.pk]),
+                    reverse('api:api_download_report', args=[self.classification.pk])):
+            cache.clear()
+            with mock.patch('waste_classifier.tasks.build_report_task.delay') as delay:
+                response = self.client.get(url)
+
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response['Retry-After'], '2')
+            delay.assert_called_once_with(self.classification.pk)
+
+        self.build_report()
+
+        storage_name = report_storage_name(self.classification)
+        self.assertTrue(default_storage.exists(storage_name))
+        with default_storage.open(storage_name) as report_file:
+            self.assertTrue(report_file.read(5).startswith(b'%PDF'))
+
+        for url in (reverse('download_report', args=[self.classification.pk]),
+                    reverse('api:api_download_report', args=[self.classification.pk])):
+            response = self.client.get(url)
+            self.assertRedirects(response, default_storage.url(storage_name), fetch_redirect_response=False)
+
+    def test_polling_queues_one_build(self):
+        url = reverse('download_report', args=[self.classification.pk])
+
+        with mock.patch('waste_classifier.tasks.build_report_task.delay') as delay:
+            for _ in range(3):
+                self.assertEqual(self.client.get(url).status_code, 202)
+
+        delay.assert_called_once_with(self.classification.pk)
+
+    def test_rebuild_deletes_old_revision(self):
+        self.build_report()
+        old_name = report_storage_name(self.classification)
+
+        self.classification.updated_at = timezone.now() + datetime.timedelta(seconds=5)
+        WasteClassification.objects.filter(pk=self.classification.pk).update(updated_at=self.classification.updated_at)
+        self.build_report()
+
+        self.assertTrue(default_storage.exists(report_storage_name(self.classification)))
+        self.assertFalse(default_storage.exists(old_name))
+
+
+class ThumbnailTests(WasteClassifierTestCase):
+
+    def test_thumbnail_is_written_next_to_the_upload(self):
+        classification = self.create_classification(image=SimpleUploadedFile('big.jpg', make_image_bytes((1600, 1200))))
+
+        thumbnail_path = get_or_create_thumbnail(classification)
+
+        self.assertEqual(thumbnail_path, f"{classification.image.path}.thumb.jpg")
+        with Image.open(thumbnail_path) as thumbnail:
+            self.assertEqual(thumbnail.size, THUMBNAIL_SIZE)
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(thumbnail_path))),
+            sorted([os.path.basename(classification.image.path), os.path.basename(thumbnail_path)])
+        )
+
+    def test_failed_write_leaves_no_files_behind(self):
+        classification = self.create_classification()
+
+        def partial_save(image, destination, *args, **kwargs):
+            with open(destination, 'wb') as partial_file:
+                partial_file.write(b'partial')
+            raise OSError('disk full')
+
+        with mock.patch.object(Image.Image, 'save', partial_save), self.assertRaises(OSError):
+            get_or_create_thumbnail(classification)
+
+        self.assertEqual(os.listdir(os.path.dirname(classification.image.path)), ['waste.jpg'])
+
+    def test_storages_without_paths_get_an_in_memory_thumbnail(self):
+        classification = self.create_classification(image=SimpleUploadedFile('big.png', make_image_bytes((1600, 1200), 'PNG')))
+
+        with mock.patch.object(FieldFile, 'path', new_callable=mock.PropertyMock, side_effect=NotImplementedError):
+            buffer = get_or_create_thumbnail(classification)
+
+        with Image.open(buffer) as thumbnail:
+            self.assertEqual(thumbnail.format, 'JPEG')
+            self.assertEqual(thumbnail.size, THUMBNAIL_SIZE)
+
+
+class WasteAnalysisFormTests(WasteClassifierTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client(enforce_csrf_checks=True)
+
+    def csrf_token(self):
+        self.client.get(reverse('analyze'))
+        return self.client.cookies['csrftoken'].value
+
+    @mock.patch('waste_classifier.views.analyze_waste_task.delay')
+    def test_post_without_csrf_token_is_rejected(self, delay):
+        response = self.client.post(reverse('analyze'), {'image': make_upload(), 'state': 'MH'})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(WasteClassification.objects.exists())
+        delay.assert_not_called()
+
+    @mock.patch('waste_classifier.views.analyze_waste_task.delay')
+    def test_valid_upload_is_queued(self, delay):
+        token = self.csrf_token()
+        handlers = []
+        original_dispatch = WasteAnalysisView.dispatch
+
+        def recording_dispatch(view, request, *args, **kwargs):
+            response = original_dispatch(view, request, *args, **kwargs)
+            handlers.extend(type(handler) for handler in request.upload_handlers)
+            return response
+
+        with mock.patch.object(WasteAnalysisView, 'dispatch', recording_dispatch):
+            response = self.client.post(reverse('analyze'), {
+                'image': make_upload(), 'state': 'MH', 'csrfmiddlewaretoken': token
+            })
+
+        waste_classification = WasteClassification.objects.get()
+        self.assertRedirects(response, reverse('results', args=[waste_classification.pk]), fetch_redirect_response=False)
+        self.assertEqual(handlers, [TemporaryFileUploadHandler])
+        self.assertEqual(waste_classification.state, 'MH')
+        self.assertTrue(waste_classification.image.storage.exists(waste_classification.image.name))
+        delay.assert_called_once_with(waste_classification.pk)
+
+
+class AnalyzeWasteTaskTests(WasteClassifierTestCase):
+
+    def run_task(self, waste_classification, analysis_result):
+        analyzer = mock.Mock()
+        analyzer.analyze_waste_image.return_value = analysis_result
+        with mock.patch('waste_classifier.tasks.get_analyzer', return_value=analyzer):
+            analyze_waste_task(waste_classification.pk)
+        analyzer.analyze_waste_image.assert_called_once_with(
+            image_path=waste_classification.image.path, state_code='MH', state_name='Maharashtra'
+        )
+        return WasteClassification.objects.get(pk=waste_classification.pk)
+
+    def test_successful_analysis_is_stored(self):
+        with mock.patch('waste_classifier.tasks.parse_gemini_response') as parse:
+            waste_classification = self.run_task(self.create_classification(), {
+                'success': True,
+                'data': make_analysis('HAZARDOUS', 0.8),
+                'raw_response': make_gemini_reply('HAZARDOUS', 0.8)
+            })
+
+        parse.assert_not_called()
+
+        self.assertEqual(waste_classification.status, 'COMPLETED')
+        self.assertEqual(waste_classification.predicted_category, 'HAZARDOUS')
+        self.assertEqual(waste_classification.confidence_score, 0.8)
+        self.assertEqual(waste_classification.gemini_raw_response, make_gemini_reply('HAZARDOUS', 0.8))
+
+    def test_unparsable_reply_is_kept(self):
+        waste_classification = self.run_task(self.create_classification(), {
+            'success': False,
+            'error': 'Failed to parse API response as JSON',
+            'raw_response': 'Sorry, I cannot help with that.'
+        })
+
+        self.assertEqual(waste_classification.status, 'FAILED')
+        self.assertEqual(waste_classification.error_message, 'Failed to parse API response as JSON')
+        self.assertEqual(waste_classification.gemini_raw_response, 'Sorry, I cannot help with that.')
+
+    def test_failed_call_is_recorded(self):
+        waste_classification = self.run_task(self.create_classification(), {
+            'success': False, 'error': 'quota exceeded'
+        })
+
+        self.assertEqual(waste_classification.status, 'FAILED')
+        self.assertEqual(waste_classification.error_message, 'quota exceeded')
+        self.assertIsNone(waste_classification.gemini_raw_response)
+
+    def test_missing_classification_is_ignored(self):
+        with mock.patch('waste_classifier.tasks.get_analyzer') as get_analyzer, \
+                self.assertLogs('waste_classifier', level='ERROR'):
+            analyze_waste_task(999)
+
+        get_analyzer.assert_not_called()
+
+
+class RawResponseCompressionTests(TestCase):
+
+    def test_raw_response_round_trips_compressed(self):
+        raw_response = make_gemini_reply() * 20
+        waste_classification = WasteClassification.objects.create(
+            image='waste_images/waste.jpg', state='MH', gemini_raw_response=raw_response
+        )
+
+        self.assertLess(len(waste_classification.gemini_raw_response_zst), len(raw_response))
+        waste_classification = WasteClassification.objects.get(pk=waste_classification.pk)
+        self.assertEqual(waste_classification.gemini_raw_response, raw_response)
+
+        waste_classification.gemini_raw_response = None
+        self.assertIsNone(waste_classification.gemini_raw_response_zst)
+
+
+class ApplyAnalysisDataTests(TestCase):
+
+    def apply(self, data):
+        waste_classification = WasteClassification(state='MH')
+        apply_analysis_data(waste_classification, data)
+        return waste_classification
+
+    def test_confidence_is_guarded(self):
+        for confidence, expected in ((1, 1.0), (0, 0.0), (0.3, 0.3), (True, 0.5), (float('nan'), 0.5),
+                                     (1.5, 0.5), (-0.1, 0.5), ('0.9', 0.5), (None, 0.5)):
+            waste_classification = self.apply({'waste_classification': {'confidence': confidence}})
+
+            self.assertEqual(waste_classification.confidence_score, expected, confidence)
+            self.assertIs(type(waste_classification.confidence_score), float)
+
+    def test_fields_are_copied(self):
+        waste_classification = self.apply(make_analysis('E_WASTE', 0.75))
+
+        self.assertEqual(waste_classification.predicted_category, 'E_WASTE')
+        self.assertEqual(waste_classification.confidence_score, 0.75)
+        self.assertEqual(waste_classification.waste_description, 'Plastic bottle')
+        self.assertEqual(waste_classification.disposal_instructions, 'Recycle')
+        self.assertEqual(waste_classification.recyclability_info, 'High')
+        self.assertEqual(waste_classification.cost_implications, '')
+
+    def test_missing_sections_use_defaults(self):
+        waste_classification = self.apply({})
+
+        self.assertEqual(waste_classification.predicted_category, 'GENERAL')
+        self.assertEqual(waste_classification.confidence_score, 0.5)
+        self.assertEqual(waste_classification.waste_description, '')
+        self.assertEqual(waste_classification.emergency_procedures, '')
+
+
+@mock.patch('waste_classifier.views.analyze_waste_task.delay')
+class UploadRejectionTests(WasteClassifierTestCase):
+
+    INVALID_UPLOADS = (
+        ('text', {'image': lambda: make_upload(b'just some text'), 'state': 'MH'}, 'image'),
+        ('truncated', {'image': lambda: make_upload(make_image_bytes()[:200]), 'state': 'MH'}, 'image'),
+        ('unknown state', {'image': make_upload, 'state': 'ZZ'}, 'state'),
+        ('missing image', {'state': 'MH'}, 'image'),
+    )
+
+    def build_data(self, fields):
+        return {name: value() if callable(value) else value for name, value in fields.items()}
+
+    def test_api_rejects_invalid_uploads(self, delay):
+        for label, fields, error_field in self.INVALID_UPLOADS:
+            with self.subTest(label), self.assertLogs('django.request', level='WARNING'):
+                response = self.client.post(reverse('api:api_analyze'), self.build_data(fields))
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(error_field, response.json()['errors'])
+
+        self.assertFalse(WasteClassification.objects.exists())
+        delay.assert_not_called()
+
+    def test_api_rejects_oversized_uploads(self, delay):
+        with mock.patch('waste_classifier.serializers.MAX_IMAGE_UPLOAD_SIZE', 100), \
+                self.assertLogs('django.request', level='WARNING'):
+            response = self.client.post(reverse('api:api_analyze'), {'image': make_upload(), 'state': 'MH'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors']['image'], ['Image size should not exceed 10MB'])
+
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.post(reverse('api:api_analyze'), {'image': make_upload(), 'state': 'MH'},
+                                        CONTENT_LENGTH=str(11 * 1024 * 1024))
+        self.assertEqual(response.status_code, 413)
+
+        self.assertFalse(WasteClassification.objects.exists())
+        delay.assert_not_called()
+
+    def test_form_rejects_invalid_uploads(self, delay):
+        for label, fields, _ in self.INVALID_UPLOADS:
+            with self.subTest(label):
+                response = self.client.post(reverse('analyze'), self.build_data(fields), follow=True)
+
+                self.assertRedirects(response, reverse('analyze'))
+                self.assertTrue(list(response.context['messages']))
+
+        self.assertFalse(WasteClassification.objects.exists())
+        delay.assert_not_called()
+
+    def test_form_rejects_oversized_uploads(self, delay):
+        with mock.patch('waste_classifier.serializers.MAX_IMAGE_UPLOAD_SIZE', 100):
+            response = self.client.post(reverse('analyze'), {'image': make_upload(), 'state': 'MH'}, follow=True)
+
+        self.assertEqual([str(message) for message in response.context['messages']],
+                         ['Image size should not exceed 10MB'])
+        self.assertFalse(WasteClassification.objects.exists())
+        delay.assert_not_called()
+
+
+class ParseGeminiResponseTests(TestCase):
+
+    def test_plain_json(self):
+        self.assertEqual(parse_gemini_response('{"a": 1}'), {'a': 1})
+
+    def test_fenced_json(self):
+        self.assertEqual(parse_gemini_response('```json\n{"a": 1}\n```'), {'a': 1})
+        self.assertEqual(parse_gemini_response('  ```\n{"a": [1, 2]}\n```\n'), {'a': [1, 2]})
+
+    def test_json_surrounded_by_prose(self):
+        self.assertEqual(parse_gemini_response('Here is the analysis:\n{"a": {"b": 2}}\nThanks!'), {'a': {'b': 2}})
+        self.assertEqual(parse_gemini_response('Result:\n```json\n{"a": 1}\n```'), {'a': 1})
+
+    def test_unterminated_fence(self):
+        self.assertEqual(parse_gemini_response('```json\n{"a": 1}'), {'a': 1})
+
+    def test_invalid_replies_raise(self):
+        for raw_response in ('', 'no json here', '```json\n{"a": \n```', '{"a": 1', '}{'):
+            with self.assertRaises(ValueError, msg=raw_response), self.assertLogs('waste_classifier', level='INFO'):
+                parse_gemini_response(raw_response)
+
+
+class ProcessResponseTests(TestCase):
+
+    def process(self, text):
+        analyzer = GeminiWasteAnalyzer.__new__(GeminiWasteAnalyzer)
+        with mock.patch.object(GeminiWasteAnalyzer, '_cache_analysis') as cache_analysis:
+            result = analyzer._process_response(mock.Mock(text=text), imagehash.hex_to_hash('0' * 16), 'MH')
+        return result, cache_analysis
+
+    def test_fenced_reply_is_parsed_and_cached(self):
+        result, cache_analysis = self.process(make_gemini_reply('ORGANIC', 0.6))
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data'], make_analysis('ORGANIC', 0.6))
+        cache_analysis.assert_called_once()
+
+    def test_reply_with_prose_uses_the_shared_parser(self):
+        result, _ = self.process('Here you go:\n' + json.dumps(make_analysis()) + '\nDone.')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data'], make_analysis())
+
+    def test_unparsable_reply_keeps_the_raw_text(self):
+        with self.assertLogs('waste_classifier', level='ERROR'):
+            result, cache_analysis = self.process('Sorry, I cannot help with that.')
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['raw_response'], 'Sorry, I cannot help with that.')
+        cache_analysis.assert_not_called()
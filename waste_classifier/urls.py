@@ -5,6 +5,7 @@ from .views import (
     HistoryView,
     ClassificationDetailView,
     WasteAnalysisAPIView,
+    WasteAnalysisStatusAPIView,
     WasteAnalysisView,
     ResultsView,
     DownloadReportView,
@@ -24,5 +25,6 @@ urlpatterns = [
 # API URLs (separate patterns)
 api_urlpatterns = [
     path('analyze/', WasteAnalysisAPIView.as_view(), name='api_analyze'),
+    path('analyze/<int:pk>/', WasteAnalysisStatusAPIView.as_view(), name='api_analyze_status'),
     path('download/<int:pk>/', DownloadReportAPIView.as_view(), name='api_download_report'),
 ]
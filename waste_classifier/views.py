@@ -1,107 +1,93 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.urls import reverse
+from django.core.paginator import Paginator
+from django.db.models import F
+from django.db.models.functions import Coalesce, Round
 from django.http import JsonResponse, FileResponse, Http404, HttpResponse
 from django.views.generic import TemplateView, DetailView
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_cookie
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.utils.decorators import method_decorator
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.core.files.storage import default_storage
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
-import json
-import re
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from drf_orjson_renderer.renderers import ORJSONRenderer
 import logging
+import orjson
 
 from .models import WasteClassification
+from .constants import INDIAN_STATES_DICT, MAX_IMAGE_UPLOAD_SIZE
 from .serializers import WasteAnalysisInputSerializer, WasteClassificationSerializer
-from .gemini_service import GeminiWasteAnalyzer
-from .pdf_report import generate_waste_classification_pdf
+from .pdf_report import REPORT_LOOKUP_FIELDS, report_storage_name
+from .tasks import analyze_waste_task, queue_report_build
 
 logger = logging.getLogger(__name__)
 
-def parse_gemini_response(raw_response):
-    """
-    Parse Gemini API response that may be wrapped in markdown code blocks
-    """
-    logger.info(f"Raw response length: {len(raw_response)}")
-    logger.info(f"Raw response first 200 chars: {repr(raw_response[:200])}")
-
-    # Clean up the response
-    cleaned_response = raw_response.strip()
-
-    try:
-        # First, try to parse as raw JSON
-        return json.loads(cleaned_response)
-    except json.JSONDecodeError as e:
-        logger.info(f"Direct JSON parsing failed: {e}")
-
-        # More aggressive markdown removal
-        if '```json' in cleaned_response:
-            # Find the start of the JSON
-            start_idx = cleaned_response.find('```json') + 7
-            # Find the end of the JSON (look for closing ```)
-            end_idx = cleaned_response.rfind('```')
-
-            if start_idx < end_idx:
-                json_string = cleaned_response[start_idx:end_idx].strip()
-                logger.info(f"Extracted JSON string length: {len(json_string)}")
-                logger.info(f"Extracted JSON first 100 chars: {repr(json_string[:100])}")
-
-                try:
-                    return json.loads(json_string)
-                except json.JSONDecodeError as e2:
-                    logger.error(f"Failed to parse extracted JSON: {e2}")
-                    # Log the problematic part
-                    logger.error(f"JSON string around error: {repr(json_string[max(0, e2.pos-50):e2.pos+50])}")
-
-        # Try regex approach as fallback
-        json_match = re.search(r'```json\s*(.*?)\s*```', cleaned_response, re.DOTALL)
-        if json_match:
-            json_string = json_match.group(1).strip()
-            logger.info(f"Regex extracted JSON: {repr(json_string[:100])}")
-            try:
-                return json.loads(json_string)
-            except json.JSONDecodeError as e3:
-                logger.error(f"Regex extracted JSON parsing failed: {e3}")
-
-        # Try to find any JSON-like content
-        json_match = re.search(r'(\{.*\})', cleaned_response, re.DOTALL)
-        if json_match:
-            json_candidate = json_match.group(1)
-            logger.info(f"Found JSON candidate: {repr(json_candidate[:100])}")
-            try:
-                return json.loads(json_candidate)
-            except json.JSONDecodeError as e4:
-                logger.error(f"JSON candidate parsing failed: {e4}")
-
-        # If all else fails, save the raw response for debugging
-        logger.error(f"Complete raw response: {repr(raw_response)}")
-        raise ValueError(f"No valid JSON found in response. All parsing methods failed.")
-
-
+# Confidence as a percentage rounded to 2 places, computed in the database
+CONFIDENCE_PERCENTAGE = Coalesce(Round(F('confidence_score') * 100, 2), 0.0)
+
+# Columns rendered by the classification detail and results pages
+DETAIL_FIELDS = (
+    'id', 'image', 'state', 'predicted_category', 'confidence_score', 'waste_description',
+    'disposal_instructions', 'state_specific_laws', 'authorized_facilities',
+    'health_hazards', 'environmental_risks', 'precautions', 'protective_equipment',
+    'emergency_procedures', 'recyclability_info', 'cost_implications',
+    'status', 'error_message', 'created_at'
+)
+
+# Seconds a rendered home page is served from the cache
+HOME_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Analysis status as reported to API clients polling for a result
+POLL_STATES = {
+    'PENDING': 'pending',
+    'COMPLETED': 'done',
+    'FAILED': 'error',
+}
+
+# Seconds clients should wait before retrying a report that is still building
+REPORT_RETRY_AFTER = 2
+
+# Cached per cookie so flash messages and sessions never leak between visitors
+@method_decorator([cache_page(HOME_PAGE_CACHE_TIMEOUT), vary_on_cookie], name='dispatch')
 class HomeView(TemplateView):
     template_name = 'waste_classifier/home.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['states'] = WasteClassification.INDIAN_STATES
-        classifications = WasteClassification.objects.all()[:6]
-        # add confidence percentages
-        for c in classifications:
-            c.confidence_percentage = round(c.confidence_score * 100, 2) if c.confidence_score else 0
+        # Only the columns the summary cards show
+        classifications = WasteClassification.objects.only(
+            'id', 'predicted_category', 'state', 'created_at'
+        ).annotate(
+            confidence_percentage=CONFIDENCE_PERCENTAGE
+        ).order_by('-created_at')[:6]
         context['recent_classifications'] = classifications
+
         context['total_classifications'] = WasteClassification.objects.count()
         return context
 
 
 class HistoryView(TemplateView):
     template_name = 'waste_classifier/history.html'
+    paginate_by = 20
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        classifications = WasteClassification.objects.all()
-        for c in classifications:
-            c.confidence_percentage = round(c.confidence_score * 100, 2) if c.confidence_score else 0
-        context['classifications'] = classifications
+        classifications = WasteClassification.objects.only(
+            'id', 'image', 'predicted_category', 'state', 'waste_description', 'created_at'
+        ).annotate(
+            confidence_percentage=CONFIDENCE_PERCENTAGE
+        ).order_by('-created_at')
+        page_obj = Paginator(classifications, self.paginate_by).get_page(self.request.GET.get('page'))
+        context['classifications'] = page_obj
+        context['page_obj'] = page_obj
         return context
 
 
@@ -110,9 +96,14 @@ class ClassificationDetailView(DetailView):
     template_name = 'waste_classifier/detail.html'
     context_object_name = 'classification'
 
+    def get_queryset(self):
+        return WasteClassification.objects.only(*DETAIL_FIELDS).annotate(
+            confidence_percentage=CONFIDENCE_PERCENTAGE
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['confidence_percentage'] = round(self.object.confidence_score * 100, 2) if self.object.confidence_score else 0
+        context['confidence_percentage'] = self.object.confidence_percentage
         return context
 
 
@@ -120,23 +111,26 @@ class DownloadReportView(DetailView):
     """View to download PDF report for waste classification"""
     model = WasteClassification
 
+    def get_queryset(self):
+        # Only the fields that locate the stored report are needed here
+        return super().get_queryset().only(*REPORT_LOOKUP_FIELDS)
+
     def get(self, request, *args, **kwargs):
         try:
             classification = self.get_object()
+            storage_name = report_storage_name(classification)
 
-            # Generate PDF report
-            pdf_buffer = generate_waste_classification_pdf(classification)
-
-            # Create filename
-            filename = f"waste_analysis_report_{classification.id}_{classification.created_at.strftime('%Y%m%d')}.pdf"
+            # Serve the built report straight from media storage
+            if default_storage.exists(storage_name):
+                return redirect(default_storage.url(storage_name))
 
-            # Create HTTP response
-            response = FileResponse(
-                pdf_buffer,
-                as_attachment=True,
-                filename=filename,
-                content_type='application/pdf'
-            )
+            # Otherwise build it in the background and show a page that retries
+            queue_report_build(classification)
+            response = render(request, 'waste_classifier/report_pending.html', {
+                'classification': classification,
+                'retry_after': REPORT_RETRY_AFTER
+            }, status=202)
+            response['Retry-After'] = str(REPORT_RETRY_AFTER)
 
             return response
 
@@ -146,35 +140,62 @@ class DownloadReportView(DetailView):
             return redirect('results', pk=self.kwargs.get('pk'))
 
 
+# Static API description served by WasteAnalysisAPIView.get, built once at import
+API_INFO = {
+    'message': 'Waste Analysis API - POST an image and state to analyze waste',
+    'endpoint': '/api/analyze/',
+    'method': 'POST',
+    'response': 'Poll the returned poll_url until analysis_state is done or error',
+    'required_fields': {
+        'image': 'Image file (jpg, png, webp, bmp) - Max 10MB',
+        'state': 'Indian state code'
+    },
+    'available_states': dict(INDIAN_STATES_DICT),
+    'waste_categories': [
+        {'code': choice[0], 'name': choice[1]}
+        for choice in WasteClassification.WASTE_CATEGORIES
+    ],
+    'example_curl': """
+curl -X POST http://127.0.0.1:8000/api/analyze/ \\
+  -F "image=@/path/to/image.jpg" \\
+  -F "state=MH"
+    """.strip()
+}
+API_INFO_JSON = orjson.dumps(API_INFO)
+
+
 class WasteAnalysisAPIView(APIView):
     """API endpoint for waste image analysis using Gemini"""
-    parser_classes = [MultiPartParser, FormParser]
-    renderer_classes = [JSONRenderer, BrowsableAPIRenderer]
+    parser_classes = [MultiPartParser]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    def dispatch(self, request, *args, **kwargs):
+        # Stream uploads straight to a temp file instead of buffering them in memory
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().dispatch(request, *args, **kwargs)
 
     def get(self, request):
         """Return API information and upload form data for browsable API"""
-        return Response({
-            'message': 'Waste Analysis API - POST an image and state to analyze waste',
-            'endpoint': '/api/analyze/',
-            'method': 'POST',
-            'required_fields': {
-                'image': 'Image file (jpg, png, webp, bmp) - Max 10MB',
-                'state': 'Indian state code'
-            },
-            'available_states': dict(WasteClassification.INDIAN_STATES),
-            'waste_categories': [
-                {'code': choice[0], 'name': choice[1]}
-                for choice in WasteClassification.WASTE_CATEGORIES
-            ],
-            'example_curl': """
-curl -X POST http://127.0.0.1:8000/api/analyze/ \\
-  -F "image=@/path/to/image.jpg" \\
-  -F "state=MH"
-            """.strip()
-        })
+        # Plain JSON clients get the pre-serialized payload without a renderer pass
+        if request.accepted_renderer.format == 'json':
+            return HttpResponse(API_INFO_JSON, content_type='application/json; charset=utf-8')
+        return Response(API_INFO)
 
     def post(self, request):
-        """Process waste image analysis"""
+        """Queue waste image analysis and return immediately"""
+        # Reject oversized bodies before the multipart parser spools them to disk;
+        # the margin leaves room for the form boundaries and the state field
+        content_length = request.META.get('CONTENT_LENGTH') or 0
+        try:
+            content_length = int(content_length)
+        except ValueError:
+            content_length = 0
+        if content_length > MAX_IMAGE_UPLOAD_SIZE + 64 * 1024:
+            return Response({
+                'success': False,
+                'error': 'Image size should not exceed 10MB'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
         serializer = WasteAnalysisInputSerializer(data=request.data)
 
         if not serializer.is_valid():
@@ -194,99 +215,19 @@ curl -X POST http://127.0.0.1:8000/api/analyze/ \\
                 state=state_code
             )
 
-            # Initialize Gemini analyzer
-            analyzer = GeminiWasteAnalyzer()
-            state_name = analyzer.get_state_name_from_code(state_code)
+            # Analyze image using Gemini API in a background worker
+            task = analyze_waste_task.delay(waste_classification.id)
 
-            # Analyze image using Gemini API
-            analysis_result = analyzer.analyze_waste_image(
-                image_path=waste_classification.image.path,
-                state_code=state_code,
-                state_name=state_name
-            )
-
-            if not analysis_result['success']:
-                return Response({
-                    'success': False,
-                    'error': analysis_result['error']
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            # Extract and parse analysis data with improved JSON handling
-            raw_response = analysis_result['raw_response']
-
-            try:
-                data = parse_gemini_response(raw_response)
-                logger.info(f"Successfully parsed Gemini response: {list(data.keys())}")
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.error(f"JSON parsing error: {e}")
-                logger.error(f"Raw response type: {type(raw_response)}")
-                logger.error(f"Raw response repr: {repr(raw_response[:200])}")
-                return Response({
-                    'success': False,
-                    'error': 'Failed to parse API response as JSON',
-                    'debug_info': {
-                        'error_message': str(e),
-                        'response_type': str(type(raw_response)),
-                        'response_preview': raw_response[:200] if isinstance(raw_response, str) else str(raw_response)[:200]
-                    }
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            # Update model instance with Gemini results
-            waste_class = data.get('waste_classification', {})
-            disposal = data.get('disposal_instructions', {})
-            risks = data.get('risk_assessment', {})
-            safety = data.get('safety_measures', {})
-            additional = data.get('additional_info', {})
-
-            waste_classification.predicted_category = waste_class.get('category', 'GENERAL')
-            waste_classification.confidence_score = float(waste_class.get('confidence', 0.5))
-            waste_classification.waste_description = waste_class.get('description', '')
-
-            waste_classification.disposal_instructions = disposal.get('general_method', '')
-            waste_classification.state_specific_laws = disposal.get('state_specific_laws', '')
-            waste_classification.authorized_facilities = disposal.get('authorized_facilities', '')
-
-            waste_classification.health_hazards = risks.get('health_hazards', '')
-            waste_classification.environmental_risks = risks.get('environmental_risks', '')
-
-            waste_classification.precautions = safety.get('precautions', '')
-            waste_classification.protective_equipment = safety.get('protective_equipment', '')
-            waste_classification.emergency_procedures = safety.get('emergency_procedures', '')
-
-            waste_classification.recyclability_info = additional.get('recyclability', '')
-            waste_classification.cost_implications = additional.get('cost_implications', '')
-
-            waste_classification.gemini_raw_response = raw_response
-            waste_classification.save()
-
-            # Prepare API response
-            response_data = {
+            return Response({
                 'success': True,
                 'data': {
                     'id': waste_classification.id,
-                    'waste_category': waste_classification.predicted_category,
-                    'category_display': waste_classification.get_predicted_category_display(),
-                    'confidence_score': round(waste_classification.confidence_score * 100, 2),
-                    'state': state_code,
-                    'state_display': state_name,
-                    'waste_description': waste_classification.waste_description,
-                    'disposal_instructions': waste_classification.disposal_instructions,
-                    'state_specific_laws': waste_classification.state_specific_laws,
-                    'authorized_facilities': waste_classification.authorized_facilities,
-                    'health_hazards': waste_classification.health_hazards,
-                    'environmental_risks': waste_classification.environmental_risks,
-                    'precautions': waste_classification.precautions,
-                    'protective_equipment': waste_classification.protective_equipment,
-                    'emergency_procedures': waste_classification.emergency_procedures,
-                    'recyclability_info': waste_classification.recyclability_info,
-                    'cost_implications': waste_classification.cost_implications,
-                    'image_url': waste_classification.image.url,
-                    'created_at': waste_classification.created_at.isoformat(),
-                    'pdf_download_url': f'/download/{waste_classification.id}/'
+                    'task_id': task.id,
+                    'status': waste_classification.status,
+                    'analysis_state': POLL_STATES[waste_classification.status],
+                    'poll_url': reverse('api:api_analyze_status', args=[waste_classification.id])
                 }
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
+            }, status=status.HTTP_202_ACCEPTED)
 
         except Exception as e:
             logger.error(f"Waste analysis error: {e}")
@@ -296,24 +237,84 @@ curl -X POST http://127.0.0.1:8000/api/analyze/ \\
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class WasteAnalysisStatusAPIView(APIView):
+    """API endpoint to poll the state of a queued waste analysis"""
+
+    def get(self, request, pk):
+        waste_classification = get_object_or_404(WasteClassification, pk=pk)
+
+        if waste_classification.status == 'PENDING':
+            return Response({
+                'success': True,
+                'data': {
+                    'id': waste_classification.id,
+                    'status': waste_classification.status,
+                    'analysis_state': POLL_STATES[waste_classification.status]
+                }
+            }, status=status.HTTP_202_ACCEPTED)
+
+        if waste_classification.status == 'FAILED':
+            return Response({
+                'success': False,
+                'data': {
+                    'id': waste_classification.id,
+                    'status': waste_classification.status,
+                    'analysis_state': POLL_STATES[waste_classification.status]
+                },
+                'error': waste_classification.error_message
+            }, status=status.HTTP_200_OK)
+
+        # Prepare API response
+        response_data = {
+            'success': True,
+            'data': {
+                'id': waste_classification.id,
+                'status': waste_classification.status,
+                'analysis_state': POLL_STATES[waste_classification.status],
+                'waste_category': waste_classification.predicted_category,
+                'category_display': waste_classification.get_predicted_category_display(),
+                'confidence_score': round(waste_classification.confidence_score * 100, 2),
+                'state': waste_classification.state,
+                'state_display': waste_classification.get_state_display(),
+                'waste_description': waste_classification.waste_description,
+                'disposal_instructions': waste_classification.disposal_instructions,
+                'state_specific_laws': waste_classification.state_specific_laws,
+                'authorized_facilities': waste_classification.authorized_facilities,
+                'health_hazards': waste_classification.health_hazards,
+                'environmental_risks': waste_classification.environmental_risks,
+                'precautions': waste_classification.precautions,
+                'protective_equipment': waste_classification.protective_equipment,
+                'emergency_procedures': waste_classification.emergency_procedures,
+                'recyclability_info': waste_classification.recyclability_info,
+                'cost_implications': waste_classification.cost_implications,
+                'image_url': waste_classification.image.url,
+                'created_at': waste_classification.created_at.isoformat(),
+                'pdf_download_url': f'/download/{waste_classification.id}/'
+            }
+        }
+
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
 class DownloadReportAPIView(APIView):
     """API endpoint to download PDF report"""
 
     def get(self, request, pk):
         try:
-            classification = get_object_or_404(WasteClassification, pk=pk)
-
-            # Generate PDF report
-            pdf_buffer = generate_waste_classification_pdf(classification)
+            classification = get_object_or_404(
+                WasteClassification.objects.only(*REPORT_LOOKUP_FIELDS), pk=pk
+            )
 
-            # Create filename
-            filename = f"waste_analysis_report_{classification.id}_{classification.created_at.strftime('%Y%m%d')}.pdf"
+            storage_name = report_storage_name(classification)
 
-            # Create HTTP response
-            response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            if default_storage.exists(storage_name):
+                return redirect(default_storage.url(storage_name))
 
-            return response
+            queue_report_build(classification)
+            return Response({
+                'status': 'building',
+                'retry_after': REPORT_RETRY_AFTER
+            }, status=status.HTTP_202_ACCEPTED, headers={'Retry-After': str(REPORT_RETRY_AFTER)})
 
         except Exception as e:
             return Response({
@@ -322,10 +323,17 @@ class DownloadReportAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
 class WasteAnalysisView(TemplateView):
     """Traditional Django view for form submission"""
     template_name = 'waste_classifier/analyze.html'
 
+    def dispatch(self, request, *args, **kwargs):
+        # Upload handlers must be swapped before the CSRF check reads request.POST,
+        # so CSRF is enforced here rather than by the middleware
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['states'] = WasteClassification.INDIAN_STATES
@@ -339,6 +347,15 @@ class WasteAnalysisView(TemplateView):
             messages.error(request, 'Please provide both image and state.')
             return redirect('analyze')
 
+        # Same checks as the API (size, signature, PIL verify, state code) before
+        # anything is written to the database or media storage
+        serializer = WasteAnalysisInputSerializer(data={'image': image, 'state': state})
+        if not serializer.is_valid():
+            for errors in serializer.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return redirect('analyze')
+
         try:
             # Create classification instance
             waste_classification = WasteClassification.objects.create(
@@ -346,55 +363,10 @@ class WasteAnalysisView(TemplateView):
                 state=state
             )
 
-            # Analyze with Gemini
-            analyzer = GeminiWasteAnalyzer()
-            state_name = analyzer.get_state_name_from_code(state)
+            # Analyze with Gemini in a background worker; results page polls
+            analyze_waste_task.delay(waste_classification.id)
 
-            analysis_result = analyzer.analyze_waste_image(
-                image_path=waste_classification.image.path,
-                state_code=state,
-                state_name=state_name
-            )
-
-            if analysis_result['success']:
-                # Parse the response with improved JSON handling
-                raw_response = analysis_result['raw_response']
-
-                try:
-                    data = parse_gemini_response(raw_response)
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.error(f"JSON parsing error in form view: {e}")
-                    logger.error(f"Raw response: {raw_response}")
-                    messages.error(request, 'Failed to parse analysis response. Please try again.')
-                    return redirect('analyze')
-
-                # Update instance with results (same as API view)
-                waste_class = data.get('waste_classification', {})
-                disposal = data.get('disposal_instructions', {})
-                risks = data.get('risk_assessment', {})
-                safety = data.get('safety_measures', {})
-                additional = data.get('additional_info', {})
-
-                waste_classification.predicted_category = waste_class.get('category', 'GENERAL')
-                waste_classification.confidence_score = float(waste_class.get('confidence', 0.5))
-                waste_classification.waste_description = waste_class.get('description', '')
-                waste_classification.disposal_instructions = disposal.get('general_method', '')
-                waste_classification.state_specific_laws = disposal.get('state_specific_laws', '')
-                waste_classification.authorized_facilities = disposal.get('authorized_facilities', '')
-                waste_classification.health_hazards = risks.get('health_hazards', '')
-                waste_classification.environmental_risks = risks.get('environmental_risks', '')
-                waste_classification.precautions = safety.get('precautions', '')
-                waste_classification.protective_equipment = safety.get('protective_equipment', '')
-                waste_classification.emergency_procedures = safety.get('emergency_procedures', '')
-                waste_classification.recyclability_info = additional.get('recyclability', '')
-                waste_classification.cost_implications = additional.get('cost_implications', '')
-                waste_classification.gemini_raw_response = raw_response
-                waste_classification.save()
-
-                return redirect('results', pk=waste_classification.id)
-            else:
-                messages.error(request, f'Analysis failed: {analysis_result["error"]}')
-                return redirect('analyze')
+            return redirect('results', pk=waste_classification.id)
 
         except Exception as e:
             logger.error(f"Waste analysis error in form view: {e}")
@@ -407,7 +379,12 @@ class ResultsView(DetailView):
     template_name = 'waste_classifier/results.html'
     context_object_name = 'classification'
 
+    def get_queryset(self):
+        return WasteClassification.objects.only(*DETAIL_FIELDS).annotate(
+            confidence_percentage=CONFIDENCE_PERCENTAGE
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['confidence_percentage'] = round(self.object.confidence_score * 100, 2) if self.object.confidence_score else 0
+        context['confidence_percentage'] = self.object.confidence_percentage
         return context
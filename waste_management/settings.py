@@ -69,4 +69,38 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Celery Configuration
+# Gemini calls are I/O bound, so run the `gemini` queue on its own thread pool
+# (the SDK uses gRPC, which blocks a gevent/eventlet hub instead of yielding):
+#   celery -A waste_management worker -Q gemini -c 16 --pool=threads
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/1')
+CELERY_TASK_ROUTES = {
+    'waste_classifier.tasks.analyze_waste_task': {'queue': 'gemini'},
+    'waste_classifier.tasks.reanalyze_waste_task': {'queue': 'gemini'},
+    'waste_classifier.tasks.submit_batch_task': {'queue': 'gemini'},
+}
+CELERY_BEAT_SCHEDULE = {
+    'poll-gemini-batch-jobs': {
+        'task': 'waste_classifier.tasks.poll_batch_jobs',
+        'schedule': 300.0,
+    },
+}
+
+# Cache Configuration (Gemini analyses are cached by image perceptual hash)
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config('REDIS_CACHE_URL', default='redis://localhost:6379/2'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'IGNORE_EXCEPTIONS': True,
+        },
+    }
 }
@@ -9,7 +9,7 @@ urlpatterns = [
     # Web interface (main site)
     path('', include('waste_classifier.urls')),
     # API endpoints
-    path('api/', include(api_urlpatterns)),
+    path('api/', include((api_urlpatterns, 'waste_classifier'), namespace='api')),
 ]
 
 if settings.DEBUG: